@@ -0,0 +1,81 @@
+import argparse
+import json
+import time
+from typing import Any
+from typing import Callable
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from benchmarks.run import get_percentiles
+from benchmarks.server import get_base_url
+from benchmarks.server import start_fixture_server
+from browser.factory import create_chrome
+from browser.factory import create_firefox
+from config.settings import apply_env_overrides
+from config.settings import presets
+
+
+PAGES = ('books.html', 'form.html', 'navigation.html')
+
+
+def measure_preset(
+    name: str, browser: str, base_url: str, iterations: int
+) -> dict[str, Any]:
+    """Return startup and page load times of the browser with the preset."""
+    preset = apply_env_overrides(presets[name])
+    create: Callable[..., WebDriver] = create_firefox
+    if browser == 'chrome':
+        create = create_chrome
+    startup_times, page_load_times = list(), list()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        driver = create(preset=preset)
+        startup_times.append(time.perf_counter() - start)
+        try:
+            for page in PAGES:
+                start = time.perf_counter()
+                driver.get(base_url + page)
+                page_load_times.append(time.perf_counter() - start)
+        finally:
+            driver.quit()
+    return {
+        'startup': get_percentiles(startup_times),
+        'page_load': get_percentiles(page_load_times),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Compare startup and page load time of run presets.'
+    )
+    parser.add_argument(
+        '--preset', action='append', choices=list(presets), default=None
+    )
+    parser.add_argument('--browser', choices=('firefox', 'chrome'))
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.set_defaults(browser='firefox')
+    args = parser.parse_args()
+
+    server = start_fixture_server()
+    base_url = get_base_url(server)
+    results = dict()
+    try:
+        for name in args.preset or presets:
+            results[name] = measure_preset(
+                name, args.browser, base_url, args.iterations
+            )
+            print(name, json.dumps(results[name]))
+    finally:
+        server.shutdown()
+
+    # Экономия относительно первого пресета (обычно interactive).
+    first, *others = results
+    for name in others:
+        for metric in ('startup', 'page_load'):
+            base = results[first][metric]['p50']
+            saved = base - results[name][metric]['p50']
+            print(f'{name}: {metric} p50 is {saved:.3f}s faster than {first}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+import argparse
+import json
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any
+from typing import ContextManager
+
+import numpy as np
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from benchmarks.scenarios import scenarios
+from benchmarks.server import get_base_url
+from benchmarks.server import start_fixture_server
+from browser.factory import chrome_session
+from browser.factory import firefox_session
+from browser.factory import get_chrome_options
+from browser.factory import get_firefox_options
+from config.settings import get_run_preset
+
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+BASELINE_PATH = BENCHMARKS_DIR / 'baseline.json'
+# Команды которые ждут загрузку страницы.
+PAGE_LOAD_COMMANDS = {
+    Command.GET,
+    Command.GO_BACK,
+    Command.GO_FORWARD,
+    Command.REFRESH,
+}
+
+
+class CommandCounter:
+    """Count WebDriver commands of the driver inside the `with` block."""
+
+    def __init__(self, driver: WebDriver) -> None:
+        self.driver = driver
+        self.counts: Counter[str] = Counter()
+        self.page_load_time = 0.0
+
+    def __enter__(self) -> 'CommandCounter':
+        execute = self.driver.execute
+
+        def counting_execute(
+            driver_command: str, params: dict[str, Any] | None = None
+        ) -> dict[str, Any]:
+            start = time.perf_counter()
+            try:
+                return execute(driver_command, params or dict())
+            finally:
+                self.counts[driver_command] += 1
+                if driver_command in PAGE_LOAD_COMMANDS:
+                    self.page_load_time += time.perf_counter() - start
+
+        # Команды элементов тоже идут через driver.execute.
+        self.driver.execute = counting_execute  # type: ignore[method-assign]
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        del self.driver.execute
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+
+def get_percentiles(values: list[float]) -> dict[str, float]:
+    return {
+        'p50': float(np.percentile(values, 50)),
+        'p95': float(np.percentile(values, 95)),
+    }
+
+
+def run_scenario(
+    driver: WebDriver,
+    name: str,
+    base_url: str,
+    download_dir: Path,
+    iterations: int,
+    warmup: int = 1,
+) -> dict[str, Any]:
+    """Run scenario `iterations` times (after warmup) and return stats.
+
+    `commands` is the maximum per iteration, `commands_by_type` is summed
+    over all iterations.
+    """
+    scenario = scenarios[name]
+    for _ in range(warmup):
+        scenario(driver, base_url, download_dir)
+
+    wall_times, page_load_times, commands = list(), list(), list()
+    # Сумма команд всех итераций, как и времена - по всем итерациям.
+    commands_by_type: Counter[str] = Counter()
+    for _ in range(iterations):
+        with CommandCounter(driver) as counter:
+            start = time.perf_counter()
+            scenario(driver, base_url, download_dir)
+            wall_times.append(time.perf_counter() - start)
+        page_load_times.append(counter.page_load_time)
+        commands.append(counter.total)
+        commands_by_type.update(counter.counts)
+    return {
+        'iterations': iterations,
+        'wall_time': get_percentiles(wall_times),
+        'page_load_time': get_percentiles(page_load_times),
+        'commands': max(commands),
+        'commands_by_type': dict(commands_by_type),
+    }
+
+
+def open_driver(browser: str, download_dir: Path) -> ContextManager[WebDriver]:
+    """Start headless browser which downloads files into download_dir."""
+    preset = get_run_preset(default='ci-fast')
+    if browser == 'chrome':
+        chrome_options = get_chrome_options(
+            headless=True, download_dir=str(download_dir), preset=preset
+        )
+        return chrome_session(chrome_options, preset)
+    options = get_firefox_options(
+        headless=True, download_dir=str(download_dir), preset=preset
+    )
+    options.set_preference(
+        'browser.helperApps.neverAsk.saveToDisk', 'application/octet-stream'
+    )
+    return firefox_session(options, preset)
+
+
+def compare(
+    results: dict[str, Any],
+    baseline: dict[str, Any],
+    tolerance: float,
+) -> list[str]:
+    """Return regressions found in results.
+
+    Time is a regression if its p50 is longer than baseline * (1 + tolerance),
+    commands count if it is greater than in baseline.
+    """
+    regressions = list()
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        for metric in ('wall_time', 'page_load_time'):
+            # p95 из десятка итераций - это одна самая медленная итерация,
+            # она только для отчета, регрессию определяет медиана.
+            value = result[metric]['p50']
+            limit = base[metric]['p50'] * (1 + tolerance)
+            if value > limit:
+                regressions.append(
+                    f'{name}: {metric} p50 {value:.3f}s > '
+                    f'{limit:.3f}s (tolerance {tolerance:.0%})'
+                )
+        if result['commands'] > base['commands']:
+            regressions.append(
+                f'{name}: {result["commands"]} commands > '
+                f'{base["commands"]} (baseline)'
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description='Run lesson scenarios on local fixture pages.'
+    )
+    parser.add_argument(
+        '--scenario', action='append', choices=list(scenarios), default=None
+    )
+    parser.add_argument('--browser', choices=('firefox', 'chrome'))
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--output', type=Path, default=None)
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument(
+        '--update-baseline',
+        action='store_true',
+        help='Save results as the new baseline instead of comparing.',
+    )
+    parser.set_defaults(browser='firefox')
+    args = parser.parse_args()
+
+    server = start_fixture_server()
+    base_url = get_base_url(server)
+    results = dict()
+    with tempfile.TemporaryDirectory() as tmp:
+        download_dir = Path(tmp)
+        with open_driver(args.browser, download_dir) as driver:
+            for name in args.scenario or scenarios:
+                results[name] = run_scenario(
+                    driver, name, base_url, download_dir, args.iterations
+                )
+                print(name, json.dumps(results[name]['wall_time']))
+    server.shutdown()
+
+    report = json.dumps(results, indent=4)
+    if args.output is not None:
+        args.output.write_text(report)
+    else:
+        print(report)
+
+    if args.update_baseline:
+        args.baseline.write_text(report)
+        print(f'Baseline saved to {args.baseline}.')
+        return 0
+    if not args.baseline.is_file():
+        print(
+            f'Baseline {args.baseline} not found, create it with '
+            '`python -m benchmarks.run --update-baseline`.',
+            file=sys.stderr,
+        )
+        return 1
+    baseline = json.loads(args.baseline.read_text())
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print('REGRESSION', regression)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
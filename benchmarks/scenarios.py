@@ -0,0 +1,144 @@
+from pathlib import Path
+from typing import Callable
+
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.wait import WebDriverWait
+
+from benchmarks.server import DOWNLOAD_SIZE
+from browser import forms
+from browser.batch import BatchActions
+from browser.downloads import DownloadWatcher
+from browser.waits import wait_until_quiet
+from config.settings import BASE_DIR
+from lesson06.interact_with_group_html_elements import get_books
+
+
+Scenario = Callable[[WebDriver, str, Path], None]
+
+UPLOAD_FILE = BASE_DIR / 'lesson10' / 'image_to_upload.png'
+
+
+def navigation(driver: WebDriver, base_url: str, download_dir: Path) -> None:
+    """lesson03: get, search, back, forward, refresh."""
+    driver.get(base_url + 'navigation.html')
+    wait_until_quiet(driver, quiet=0.1)
+    driver.get(base_url + 'navigation.html?q=hello+world')
+    wait_until_quiet(driver, quiet=0.1)
+    driver.back()
+    wait_until_quiet(driver, quiet=0.1)
+    driver.forward()
+    wait_until_quiet(driver, quiet=0.1)
+    driver.refresh()
+    wait_until_quiet(driver, quiet=0.1)
+    assert len(driver.find_elements('css selector', '#results a')) == 10
+
+
+def find_elements(
+    driver: WebDriver, base_url: str, download_dir: Path
+) -> None:
+    """lesson05: add 10 buttons, delete 4 of them, count the rest."""
+    driver.get(base_url + 'add_remove.html')
+    add_button = driver.find_element('xpath', '//button[text()="Add Element"]')
+    for _ in range(10):
+        add_button.click()
+    delete = ('xpath', '//button[@onclick="deleteElement()"]')
+    for button in driver.find_elements(*delete)[:4]:
+        button.click()
+    assert len(driver.find_elements(*delete)) == 6
+
+
+def find_elements_batch(
+    driver: WebDriver, base_url: str, download_dir: Path
+) -> None:
+    """lesson05 with BatchActions: all clicks in one script call."""
+    driver.get(base_url + 'add_remove.html')
+    add = ('xpath', '//button[text()="Add Element"]')
+    delete = ('xpath', '//button[@onclick="deleteElement()"]')
+    batch = BatchActions(driver)
+    for _ in range(10):
+        batch.click(add)
+    for _ in range(4):
+        batch.click(delete)
+    assert all(result.ok for result in batch.run())
+    assert len(driver.find_elements(*delete)) == 6
+
+
+def scrape_cards(driver: WebDriver, base_url: str, download_dir: Path) -> None:
+    """lesson06: read all book cards of the page."""
+    driver.get(base_url + 'books.html')
+    assert len(get_books(driver)) == 20
+
+
+def fill_form(driver: WebDriver, base_url: str, download_dir: Path) -> None:
+    """lesson08: type name, phone, date, choose payment and register."""
+    driver.get(base_url + 'form.html')
+    ac = ActionChains(driver)
+    fields = (
+        ('ContactName', 'Pythonist', 'Pythonist'),
+        ('contactnumber', '012-3456789', '012-3456789'),
+        ('pickupdate', '12282024', '2024-12-28'),
+    )
+    for name, keys, value in fields:
+        field = driver.find_element('xpath', f'//input[@name="{name}"]')
+        field.clear()
+        ac.send_keys_to_element(field, keys).perform()
+        assert field.get_attribute('value') == value
+    driver.find_element('xpath', '//option[@value="cashondelivery"]').click()
+    driver.find_element('xpath', '//button[text()=" Register "]').click()
+    assert driver.find_element('id', 'result').text == 'Thank you'
+
+
+def fill_form_bulk(
+    driver: WebDriver, base_url: str, download_dir: Path
+) -> None:
+    """lesson08 with fill_form: text fields in one script, date by keys."""
+    driver.get(base_url + 'form.html')
+    pickup_date = ('xpath', '//input[@name="pickupdate"]')
+    forms.fill_form(
+        driver,
+        {
+            ('xpath', '//input[@name="ContactName"]'): 'Pythonist',
+            ('xpath', '//input[@name="contactnumber"]'): '012-3456789',
+            pickup_date: '12282024',
+            ('xpath', '//select[@name="payment"]'): 'cashondelivery',
+        },
+        keystrokes=[pickup_date],
+        expected={pickup_date: '2024-12-28'},
+    )
+    driver.find_element('xpath', '//button[text()=" Register "]').click()
+    assert driver.find_element('id', 'result').text == 'Thank you'
+
+
+def upload_download(
+    driver: WebDriver, base_url: str, download_dir: Path
+) -> None:
+    """lesson10: upload the image, download the file and wait for it."""
+    driver.get(base_url + 'upload.html')
+    driver.find_element('xpath', '//input[@type="file"]').send_keys(
+        str(UPLOAD_FILE)
+    )
+    driver.find_element('xpath', '//button[text()="Upload"]').click()
+    wait = WebDriverWait(driver, timeout=10, poll_frequency=0.05)
+    wait.until(EC.presence_of_element_located(('id', 'size')))
+
+    path = download_dir / 'sample.bin'
+    path.unlink(missing_ok=True)
+    driver.get(base_url + 'download.html')
+    # Файл готов когда браузер переименует его временный файл.
+    with DownloadWatcher(str(download_dir)) as watcher:
+        driver.find_element('xpath', '//a[@download=""]').click()
+        download = watcher.wait(1, timeout=10)[0]
+    assert download.size == DOWNLOAD_SIZE
+
+
+scenarios: dict[str, Scenario] = {
+    'navigation': navigation,
+    'find_elements': find_elements,
+    'find_elements_batch': find_elements_batch,
+    'scrape_cards': scrape_cards,
+    'fill_form': fill_form,
+    'fill_form_bulk': fill_form_bulk,
+    'upload_download': upload_download,
+}
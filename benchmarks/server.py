@@ -0,0 +1,94 @@
+import html
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
+DOWNLOAD_SIZE = 256 * 1024
+
+# Разметка карточки как на books.toscrape.com (lesson06).
+BOOK_CARD = '''
+<li><article class="product_pod">
+    <h3><a href="#" title="{title}">{short_title}</a></h3>
+    <div class="product_price">
+        <p class="price_color">£{price}</p>
+        <p class="{availability} availability">{stock}</p>
+    </div>
+</article></li>
+'''
+
+
+def get_books_page(count: int = 20) -> str:
+    cards = list()
+    for index in range(count):
+        title = html.escape(f'Book number {index} with a long title')
+        cards.append(
+            BOOK_CARD.format(
+                title=title,
+                short_title=title[:20] + '...',
+                price=f'{10 + index * 1.37:.2f}',
+                availability='instock' if index % 3 else 'outofstock',
+                stock='In stock' if index % 3 else 'Out of stock',
+            )
+        )
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">'
+        '<title>Books</title></head><body><ol class="row">'
+        + ''.join(cards)
+        + '</ol></body></html>'
+    )
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """Static fixture pages, generated book list, upload and download."""
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def send_body(self, body: bytes, content_type: str, **headers: str):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name.replace('_', '-'), value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path.startswith('/books.html'):
+            body = get_books_page().encode()
+            return self.send_body(body, 'text/html; charset=utf-8')
+        if self.path == '/files/sample.bin':
+            return self.send_body(
+                b'\0' * DOWNLOAD_SIZE,
+                'application/octet-stream',
+                Content_Disposition='attachment; filename="sample.bin"',
+            )
+        super().do_GET()
+
+    def do_POST(self) -> None:
+        if self.path != '/upload':
+            return self.send_error(404)
+        # Тело не разбираем: проверяется только что файл дошел до сервера.
+        size = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(size)
+        body = f'<h1>File Uploaded!</h1><p id="size">{size}</p>'.encode()
+        self.send_body(body, 'text/html; charset=utf-8')
+
+
+def start_fixture_server(port: int = 0) -> ThreadingHTTPServer:
+    """Serve fixtures on 127.0.0.1 in a background thread."""
+    handler = partial(FixtureHandler, directory=str(FIXTURES_DIR))
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def get_base_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f'http://{host!s}:{port}/'
@@ -0,0 +1,204 @@
+import platform
+from typing import Literal
+from typing import Sequence
+
+from pydantic import BaseModel
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+from browser.forms import SET_VALUE_JS
+from browser.locators import FIND_ELEMENT_JS
+from browser.locators import Locator
+
+
+Action = Literal['click', 'send_keys', 'clear', 'hover']
+BatchMode = Literal['script', 'actions']
+Target = WebElement | Locator
+Step = tuple[Target, Action] | tuple[Target, Action, str]
+
+# Выполняет шаги по очереди в одном вызове execute_script. Локатор ищется
+# в момент выполнения шага, поэтому шаги видят изменения ДОМа от прошлых.
+# Возвращает результат каждого шага: [ok, error].
+BATCH_JS = (
+    FIND_ELEMENT_JS
+    + SET_VALUE_JS
+    + '''
+var steps = arguments[0], stopOnError = arguments[1];
+var findOrThrow = function (by, value) {
+    var element = find(by, value);
+    if (element === null) {
+        throw new Error('Element ' + by + '=' + value + ' not found.');
+    }
+    return element;
+};
+var input = function (element, value) {
+    setValue(element, value);
+    element.dispatchEvent(new Event('input', {bubbles: true}));
+    element.dispatchEvent(new Event('change', {bubbles: true}));
+};
+var results = [];
+for (var i = 0; i < steps.length; i++) {
+    if (stopOnError && results.length && !results[results.length - 1][0]) {
+        results.push([false, 'Skipped after the failed step.']);
+        continue;
+    }
+    var target = steps[i][0], action = steps[i][1], value = steps[i][2];
+    try {
+        var element = Array.isArray(target)
+            ? findOrThrow(target[0], target[1])
+            : target;
+        if (action === 'click') {
+            element.click();
+        } else if (action === 'send_keys') {
+            element.focus();
+            input(element, element.value + value);
+        } else if (action === 'clear') {
+            input(element, '');
+        } else if (action === 'hover') {
+            var event = new MouseEvent('mouseover', {bubbles: true});
+            element.dispatchEvent(event);
+        } else {
+            throw new Error('Unknown action ' + action + '.');
+        }
+        results.push([true, null]);
+    } catch (error) {
+        results.push([false, String(error)]);
+    }
+}
+return results;
+'''
+)
+
+# Находит первый элемент каждого локатора, null если элемента нет.
+FIND_ALL_JS = (
+    FIND_ELEMENT_JS
+    + '''
+return arguments[0].map(function (locator) {
+    return find(locator[0], locator[1]);
+});
+'''
+)
+
+
+class StepResult(BaseModel):
+    index: int
+    action: Action
+    ok: bool
+    error: str | None = None
+
+
+class BatchActions:
+    """Steps (element or locator, action) sent to the browser at once.
+
+    Mode 'script' runs all steps in one execute_script and reports result
+    of every step. Events of this mode are synthetic (isTrusted is false).
+    Mode 'actions' compiles steps into one W3C Actions command, so events
+    are real, but locators are found before the actions (one script call)
+    and a failure fails the whole batch.
+    """
+
+    def __init__(
+        self,
+        driver: WebDriver,
+        steps: Sequence[Step] = (),
+    ) -> None:
+        self.driver = driver
+        self.steps: list[tuple[Target, Action, str]] = list()
+        for target, action, *value in steps:
+            self.add(target, action, *value)
+
+    def add(
+        self, target: Target, action: Action, value: str = ''
+    ) -> 'BatchActions':
+        if not isinstance(target, WebElement):
+            if target[0] not in ('xpath', 'css selector'):
+                raise ValueError(f'Locator {target[0]!r} is not supported.')
+        self.steps.append((target, action, value))
+        return self
+
+    def click(self, target: Target) -> 'BatchActions':
+        return self.add(target, 'click')
+
+    def send_keys(self, target: Target, text: str) -> 'BatchActions':
+        return self.add(target, 'send_keys', text)
+
+    def clear(self, target: Target) -> 'BatchActions':
+        return self.add(target, 'clear')
+
+    def hover(self, target: Target) -> 'BatchActions':
+        return self.add(target, 'hover')
+
+    def run(
+        self, mode: BatchMode = 'script', stop_on_error: bool = True
+    ) -> list[StepResult]:
+        """Perform the steps and return result of each of them."""
+        if not self.steps:
+            return list()
+        if mode == 'actions':
+            return self._run_actions()
+        payload = [
+            [target if isinstance(target, WebElement) else list(target), *step]
+            for target, *step in self.steps
+        ]
+        results = self.driver.execute_script(BATCH_JS, payload, stop_on_error)
+        return [
+            StepResult(index=index, action=step[1], ok=ok, error=error)
+            for index, (step, (ok, error)) in enumerate(
+                zip(self.steps, results)
+            )
+        ]
+
+    def _get_elements(self) -> list[WebElement]:
+        locators = [
+            list(target)
+            for target, _, _ in self.steps
+            if not isinstance(target, WebElement)
+        ]
+        found = iter(
+            self.driver.execute_script(FIND_ALL_JS, locators)
+            if locators
+            else ()
+        )
+        elements = [
+            target if isinstance(target, WebElement) else next(found)
+            for target, _, _ in self.steps
+        ]
+        missing = [
+            index for index, element in enumerate(elements) if element is None
+        ]
+        if missing:
+            raise NoSuchElementException(
+                f'Elements of steps {missing} not found.'
+            )
+        return elements
+
+    def _run_actions(self) -> list[StepResult]:
+        error = None
+        try:
+            elements = self._get_elements()
+            # Выделить все: в macOS через COMMAND, в остальных через CONTROL.
+            modifier = Keys.CONTROL
+            if platform.system() == 'Darwin':
+                modifier = Keys.COMMAND
+            # duration=0: курсор перемещается сразу, без анимации 250 мс.
+            chain = ActionChains(self.driver, duration=0)
+            for element, (_, action, value) in zip(elements, self.steps):
+                chain.move_to_element(element)
+                if action == 'click':
+                    chain.click()
+                elif action == 'send_keys':
+                    chain.click().send_keys(value)
+                elif action == 'clear':
+                    chain.click().key_down(modifier).send_keys('a')
+                    chain.key_up(modifier).send_keys(Keys.BACKSPACE)
+            chain.perform()
+        except WebDriverException as exception:
+            error = exception.msg or type(exception).__name__
+        return [
+            StepResult(index=i, action=action, ok=error is None, error=error)
+            for i, (_, action, _) in enumerate(self.steps)
+        ]
@@ -0,0 +1,339 @@
+import asyncio
+import itertools
+import json
+from contextlib import asynccontextmanager
+from typing import Any
+from typing import AsyncIterator
+
+from pydantic import BaseModel
+from selenium.webdriver.remote.webdriver import WebDriver
+from websockets import ConnectionClosed
+from websockets import connect
+
+
+# Сообщения с содержимым страниц бывают большими.
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+FIND_ALL_JS = '''
+function (xpath) {
+    var nodes = document.evaluate(
+        xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+    );
+    var result = [];
+    for (var i = 0; i < nodes.snapshotLength; i++) {
+        result.push(nodes.snapshotItem(i));
+    }
+    return result;
+}
+'''
+
+# Промис выполняется когда элемент появится в ДОМе, браузер сам сообщает об
+# этом MutationObserver'ом, опрашивать страницу не нужно.
+WAIT_FOR_JS = '''
+function (xpath, timeout) {
+    var find = function () {
+        return document.evaluate(
+            xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+        ).singleNodeValue;
+    };
+    return new Promise(function (resolve, reject) {
+        var element = find();
+        if (element !== null) {
+            return resolve(element);
+        }
+        var observer = new MutationObserver(function () {
+            var element = find();
+            if (element !== null) {
+                observer.disconnect();
+                clearTimeout(timer);
+                resolve(element);
+            }
+        });
+        var timer = setTimeout(function () {
+            observer.disconnect();
+            reject(new Error('Element ' + xpath + ' not found.'));
+        }, timeout);
+        observer.observe(document, {childList: true, subtree: true});
+    });
+}
+'''
+
+
+EventQueue = asyncio.Queue[dict[str, Any]]
+
+
+class BiDiError(Exception):
+    """Error returned by the browser for a BiDi command or a script."""
+
+
+class Node(BaseModel):
+    """Reference to a DOM node of the page."""
+
+    shared_id: str
+
+
+def serialize(value: Any) -> dict[str, Any]:
+    """Return python value as BiDi local value (argument of a script)."""
+    if isinstance(value, Node):
+        return {'sharedId': value.shared_id}
+    if value is None:
+        return {'type': 'null'}
+    if isinstance(value, bool):
+        return {'type': 'boolean', 'value': value}
+    if isinstance(value, (int, float)):
+        return {'type': 'number', 'value': value}
+    if isinstance(value, str):
+        return {'type': 'string', 'value': value}
+    if isinstance(value, (list, tuple)):
+        return {'type': 'array', 'value': [serialize(v) for v in value]}
+    if isinstance(value, dict):
+        return {
+            'type': 'object',
+            'value': [[str(k), serialize(v)] for k, v in value.items()],
+        }
+    raise TypeError(f'Value of type {type(value).__name__} is not supported.')
+
+
+def deserialize(remote: dict[str, Any]) -> Any:
+    """Return python value of BiDi remote value (result of a script)."""
+    kind = remote['type']
+    value = remote.get('value')
+    if kind in ('undefined', 'null'):
+        return None
+    if kind == 'node':
+        return Node(shared_id=remote['sharedId'])
+    if kind == 'number' and isinstance(value, str):
+        # NaN, -0, Infinity и -Infinity передаются строками.
+        return float(value)
+    if kind == 'bigint':
+        return int(value)  # type: ignore[arg-type]
+    if kind in ('array', 'set', 'nodelist', 'htmlcollection'):
+        return [deserialize(item) for item in value or ()]
+    if kind in ('object', 'map'):
+        return {
+            key if isinstance(key, str) else deserialize(key): deserialize(v)
+            for key, v in value or ()
+        }
+    return value
+
+
+class BiDiConnection:
+    """WebDriver BiDi websocket shared by any number of coroutines.
+
+    Commands are matched with responses by id, so commands of different
+    tabs can be awaited at the same time with `asyncio.gather`.
+    """
+
+    def __init__(self, websocket: Any) -> None:
+        self.websocket = websocket
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future[dict[str, Any]]] = dict()
+        self._listeners: dict[str, list[EventQueue]] = dict()
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self) -> None:
+        try:
+            async for message in self.websocket:
+                data = json.loads(message)
+                if 'id' not in data:
+                    for queue in self._listeners.get(data.get('method'), ()):
+                        queue.put_nowait(data['params'])
+                    continue
+                future = self._pending.pop(data['id'], None)
+                if future is None or future.done():
+                    continue
+                if 'error' in data:
+                    future.set_exception(
+                        BiDiError(f'{data["error"]}: {data.get("message")}')
+                    )
+                else:
+                    future.set_result(data['result'])
+        finally:
+            # Соединение закрыто, ждущие команды ответа уже не получат.
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(BiDiError('Connection closed.'))
+            self._pending.clear()
+
+    async def send(
+        self, method: str, params: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """Send the command and return its result."""
+        command_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[command_id] = future
+        message = {'id': command_id, 'method': method, 'params': params or {}}
+        await self.websocket.send(json.dumps(message))
+        return await future
+
+    async def events(
+        self, *names: str, contexts: list[str] | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Subscribe to events and yield params of each pushed event.
+
+        The subscription is removed when the iteration stops.
+        """
+        queue: EventQueue = asyncio.Queue()
+        for name in names:
+            self._listeners.setdefault(name, list()).append(queue)
+        params: dict[str, Any] = {'events': list(names)}
+        if contexts is not None:
+            params['contexts'] = contexts
+        await self.send('session.subscribe', params)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            for name in names:
+                self._listeners[name].remove(queue)
+            # Иначе браузер продолжит слать события, которые никто не ждет.
+            # События, которые слушают другие итераторы, остаются.
+            unused = [name for name in names if not self._listeners[name]]
+            if unused:
+                try:
+                    await self.send(
+                        'session.unsubscribe', {**params, 'events': unused}
+                    )
+                except (BiDiError, ConnectionClosed):
+                    # Соединение уже закрыто вместе с подпиской.
+                    pass
+
+    async def new_tab(self) -> 'Tab':
+        result = await self.send('browsingContext.create', {'type': 'tab'})
+        return Tab(self, result['context'])
+
+    async def get_tabs(self) -> list['Tab']:
+        result = await self.send('browsingContext.getTree', {'maxDepth': 0})
+        return [Tab(self, item['context']) for item in result['contexts']]
+
+    async def close(self) -> None:
+        await self.websocket.close()
+        await asyncio.gather(self._reader, return_exceptions=True)
+
+
+class Tab:
+    """Browsing context (tab) driven through the BiDi connection."""
+
+    def __init__(self, connection: BiDiConnection, context: str) -> None:
+        self.connection = connection
+        self.context = context
+
+    async def navigate(self, url: str, wait: str = 'complete') -> None:
+        await self.connection.send(
+            'browsingContext.navigate',
+            {'context': self.context, 'url': url, 'wait': wait},
+        )
+
+    async def call_function(
+        self, declaration: str, *args: Any, await_promise: bool = True
+    ) -> Any:
+        """Call JS function with args in the page and return its result."""
+        result = await self.connection.send(
+            'script.callFunction',
+            {
+                'functionDeclaration': declaration,
+                'arguments': [serialize(arg) for arg in args],
+                'awaitPromise': await_promise,
+                'target': {'context': self.context},
+                'serializationOptions': {'maxDomDepth': 0},
+            },
+        )
+        if result['type'] == 'exception':
+            raise BiDiError(result['exceptionDetails']['text'])
+        return deserialize(result['result'])
+
+    async def evaluate(self, expression: str) -> Any:
+        result = await self.connection.send(
+            'script.evaluate',
+            {
+                'expression': expression,
+                'awaitPromise': True,
+                'target': {'context': self.context},
+            },
+        )
+        if result['type'] == 'exception':
+            raise BiDiError(result['exceptionDetails']['text'])
+        return deserialize(result['result'])
+
+    async def find_elements(self, xpath: str) -> list[Node]:
+        return await self.call_function(FIND_ALL_JS, xpath)
+
+    async def find_element(self, xpath: str) -> Node:
+        elements = await self.find_elements(xpath)
+        if not elements:
+            raise BiDiError(f'Element {xpath} not found.')
+        return elements[0]
+
+    async def wait_for_element(self, xpath: str, timeout: float = 10) -> Node:
+        """Return element as soon as it appears in DOM."""
+        return await self.call_function(WAIT_FOR_JS, xpath, timeout * 1000)
+
+    async def perform_actions(self, actions: list[dict[str, Any]]) -> None:
+        await self.connection.send(
+            'input.performActions',
+            {'context': self.context, 'actions': actions},
+        )
+
+    async def click(self, element: Node) -> None:
+        origin = {'type': 'element', 'element': serialize(element)}
+        await self.perform_actions(
+            [
+                {
+                    'type': 'pointer',
+                    'id': 'mouse',
+                    'actions': [
+                        {
+                            'type': 'pointerMove',
+                            'x': 0,
+                            'y': 0,
+                            'origin': origin,
+                        },
+                        {'type': 'pointerDown', 'button': 0},
+                        {'type': 'pointerUp', 'button': 0},
+                    ],
+                }
+            ]
+        )
+
+    async def send_keys(self, element: Node, text: str) -> None:
+        """Click the element and type text with real key events."""
+        await self.click(element)
+        keys = list()
+        for char in text:
+            keys.append({'type': 'keyDown', 'value': char})
+            keys.append({'type': 'keyUp', 'value': char})
+        await self.perform_actions(
+            [{'type': 'key', 'id': 'keyboard', 'actions': keys}]
+        )
+
+    async def close(self) -> None:
+        await self.connection.send(
+            'browsingContext.close', {'context': self.context}
+        )
+
+
+def get_websocket_url(driver: WebDriver) -> str:
+    """Return BiDi url of the session started with `webSocketUrl` = True."""
+    url = driver.capabilities.get('webSocketUrl')
+    if not isinstance(url, str):
+        raise BiDiError(
+            'Session has no BiDi websocket, start the browser with '
+            'get_firefox_options(bidi=True).'
+        )
+    return url
+
+
+@asynccontextmanager
+async def open_bidi(driver: WebDriver) -> AsyncIterator[BiDiConnection]:
+    """Connect to BiDi websocket of the session for the `async with` block.
+
+    The driver stays usable for classic commands of the same browser.
+    """
+    websocket = await connect(
+        get_websocket_url(driver), max_size=MAX_MESSAGE_SIZE
+    )
+    connection = BiDiConnection(websocket)
+    try:
+        yield connection
+    finally:
+        await connection.close()
@@ -0,0 +1,343 @@
+import ctypes
+import ctypes.util
+import hashlib
+import os
+import select
+import struct
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from pathlib import Path
+from typing import Any
+from typing import BinaryIO
+from typing import Callable
+from typing import Literal
+from urllib.parse import unquote
+from urllib.parse import urlparse
+
+import requests
+from pydantic import BaseModel
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+# Браузер пишет файл во временный файл и переименовывает его в конце.
+TEMP_SUFFIXES = ('.part', '.crdownload', '.tmp')
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_TO = 0x80
+EVENT_HEADER = struct.Struct('iIII')
+CHUNK_SIZE = 1024 * 1024
+
+# Адреса ссылок и User-Agent браузера одним вызовом.
+GET_LINKS_JS = '''
+var links = document.evaluate(
+    arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+);
+var urls = [];
+for (var i = 0; i < links.snapshotLength; i++) {
+    urls.push(links.snapshotItem(i).href);
+}
+return [urls, navigator.userAgent];
+'''
+
+# Нажимает все ссылки сразу, браузер качает файлы параллельно.
+CLICK_LINKS_JS = '''
+var links = document.evaluate(
+    arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+);
+for (var i = 0; i < links.snapshotLength; i++) {
+    links.snapshotItem(i).click();
+}
+return links.snapshotLength;
+'''
+
+
+class Download(BaseModel):
+    path: str
+    size: int
+    sha256: str
+
+
+def is_temp_file(name: str) -> bool:
+    return name.endswith(TEMP_SUFFIXES) or name.startswith('.')
+
+
+def has_temp_sibling(path: Path) -> bool:
+    return any(
+        path.with_name(path.name + suffix).exists() for suffix in TEMP_SUFFIXES
+    )
+
+
+def is_empty(path: Path) -> bool:
+    try:
+        return path.stat().st_size == 0
+    except FileNotFoundError:
+        return True
+
+
+def get_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        while chunk := file.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Inotify:
+    """Minimal inotify (Linux) through ctypes, None from `create` elsewhere."""
+
+    def __init__(self, fd: int) -> None:
+        self.fd = fd
+
+    @classmethod
+    def create(cls, directory: str, mask: int) -> 'Inotify | None':
+        if not sys.platform.startswith('linux'):
+            return None
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+            os.close(fd)
+            return None
+        return cls(fd)
+
+    def read(self, timeout: float) -> list[tuple[int, str]]:
+        """Return (mask, name) of events, wait at most `timeout` seconds."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return list()
+        data = os.read(self.fd, 64 * 1024)
+        events, offset = list(), 0
+        while offset < len(data):
+            _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b'\0')
+            offset += length
+            events.append((mask, os.fsdecode(name)))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class DownloadWatcher:
+    """Report files completed in the directory while the watcher runs.
+
+    A file is complete when its temporary file (.part, .crdownload) is
+    renamed to the final name. Linux is watched with inotify, other systems
+    are polled: a file is complete when its size stops changing. Every
+    completed file is hashed and passed to `on_complete`.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        on_complete: Callable[[Download], Any] | None = None,
+        poll: float = 0.2,
+    ) -> None:
+        self.directory = Path(directory)
+        self.on_complete = on_complete
+        self.poll = poll
+        self.completed: list[Download] = list()
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._inotify: Inotify | None = None
+
+    def __enter__(self) -> 'DownloadWatcher':
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self._inotify = Inotify.create(
+            str(self.directory), IN_CLOSE_WRITE | IN_MOVED_TO
+        )
+        self._stop.clear()
+        if self._inotify is not None:
+            self._thread = threading.Thread(target=self._watch, daemon=True)
+        else:
+            # Файлы которые уже лежат в папке не считаются новыми.
+            existing = set(self.directory.iterdir())
+            self._thread = threading.Thread(
+                target=self._poll, args=(existing,), daemon=True
+            )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _complete(self, path: Path) -> None:
+        if not path.is_file():
+            return
+        download = Download(
+            path=str(path), size=path.stat().st_size, sha256=get_sha256(path)
+        )
+        with self._condition:
+            self.completed.append(download)
+            self._condition.notify_all()
+        if self.on_complete is not None:
+            self.on_complete(download)
+
+    def _watch(self) -> None:
+        # Перезапись уже существующего файла - тоже новая загрузка, поэтому
+        # учитываются все события с начала наблюдения.
+        assert self._inotify is not None
+        while not self._stop.is_set():
+            for mask, name in self._inotify.read(self.poll):
+                if is_temp_file(name):
+                    continue
+                path = self.directory / name
+                # Firefox сначала создает пустой файл-заглушку рядом с .part,
+                # закрытие заглушки - еще не конец загрузки.
+                if mask & IN_CLOSE_WRITE and (
+                    has_temp_sibling(path) or is_empty(path)
+                ):
+                    continue
+                self._complete(path)
+
+    def _poll(self, existing: set[Path]) -> None:
+        done = set(existing)
+        sizes: dict[Path, int] = dict()
+        while not self._stop.wait(self.poll):
+            for path in self.directory.iterdir():
+                if path in done or is_temp_file(path.name):
+                    continue
+                if has_temp_sibling(path):
+                    continue
+                try:
+                    size = path.stat().st_size
+                except FileNotFoundError:
+                    continue
+                # Файл готов если размер не изменился с прошлой проверки.
+                if sizes.get(path) == size:
+                    done.add(path)
+                    self._complete(path)
+                else:
+                    sizes[path] = size
+
+    def wait(self, count: int, timeout: float = 60) -> list[Download]:
+        """Wait until `count` files are completed and return them."""
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: len(self.completed) >= count, timeout
+            ):
+                raise TimeoutError(
+                    f'{len(self.completed)} of {count} files downloaded '
+                    f'in {timeout} seconds.'
+                )
+            return self.completed[:count]
+
+
+def get_session(driver: WebDriver, user_agent: str) -> requests.Session:
+    """Return requests session with cookies and User-Agent of the browser."""
+    session = requests.Session()
+    session.headers['User-Agent'] = user_agent
+    for cookie in driver.get_cookies():
+        session.cookies.set(
+            cookie['name'],
+            cookie['value'],
+            domain=cookie.get('domain'),
+            path=cookie.get('path', '/'),
+        )
+    return session
+
+
+def get_filename(response: requests.Response, url: str) -> str:
+    """Return file name from Content-Disposition or from the url."""
+    message = Message()
+    message['content-disposition'] = response.headers.get(
+        'content-disposition', ''
+    )
+    name = message.get_filename() or unquote(Path(urlparse(url).path).name)
+    # Имя из заголовка может содержать путь, оставляем только имя файла.
+    return Path(name.replace('\\', '/')).name or 'download'
+
+
+def open_unique(directory: Path, name: str) -> tuple[Path, BinaryIO]:
+    """Open .part file of a name not used in directory: `name (1).ext`...
+
+    Returns the final path and the opened .part file. The .part file is
+    created exclusively, so threads fetching equal names get different ones.
+    """
+    stem, suffix = Path(name).stem, Path(name).suffix
+    index = 0
+    while True:
+        final = name if index == 0 else f'{stem} ({index}){suffix}'
+        index += 1
+        path = directory / final
+        try:
+            file = open(path.with_name(final + '.part'), 'xb')
+        except FileExistsError:
+            continue
+        if not path.exists():
+            return path, file
+        file.close()
+        os.unlink(file.name)
+
+
+def fetch_file(
+    session: requests.Session, url: str, directory: Path, timeout: float
+) -> Path:
+    """Stream url into directory through a .part file.
+
+    The name is taken from Content-Disposition or from the url, files of
+    equal names are saved as `name (1).ext`, `name (2).ext`...
+    """
+    with session.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        path, file = open_unique(directory, get_filename(response, url))
+        try:
+            with file:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    file.write(chunk)
+        except BaseException:
+            os.unlink(file.name)
+            raise
+    os.replace(file.name, path)
+    return path
+
+
+def download_links(
+    driver: WebDriver,
+    xpath: str,
+    directory: str,
+    mode: Literal['browser', 'http'] = 'http',
+    workers: int = 4,
+    timeout: float = 60,
+    on_complete: Callable[[Download], Any] | None = None,
+) -> list[Download]:
+    """Download files of all links found by xpath and wait for all of them.
+
+    Mode 'browser' clicks all links at once (browser must save files into
+    `directory` without asking; google-chrome options of
+    get_chrome_options(download_dir=...) also allow several downloads from
+    one page). Mode 'http' fetches links in `workers`
+    threads with cookies of the browser session.
+    """
+    with DownloadWatcher(directory, on_complete) as watcher:
+        if mode == 'browser':
+            count = driver.execute_script(CLICK_LINKS_JS, xpath)
+        else:
+            urls, user_agent = driver.execute_script(GET_LINKS_JS, xpath)
+            count = len(urls)
+            session = get_session(driver, user_agent)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        fetch_file, session, url, Path(directory), timeout
+                    )
+                    for url in urls
+                ]
+                for future in futures:
+                    future.result()
+        return watcher.wait(count, timeout)
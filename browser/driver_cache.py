@@ -0,0 +1,163 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import stat
+from pathlib import Path
+from typing import Literal
+
+from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.core.os_manager import ChromeType
+from webdriver_manager.core.os_manager import OperationSystemManager
+from webdriver_manager.firefox import GeckoDriverManager
+
+from config.settings import set_new_folder_or_get_existent
+
+
+Browser = Literal['firefox', 'chrome']
+
+# Типы браузеров в терминах webdriver_manager (для определения версии в ОС).
+browser_types: dict[str, str] = {
+    'firefox': 'firefox',
+    'chrome': ChromeType.GOOGLE,
+}
+INDEX_NAME = 'index.json'
+UNKNOWN_VERSION = 'unknown'
+
+
+def is_offline() -> bool:
+    """Return True if network lookups of drivers are forbidden."""
+    return os.getenv('DRIVERS_OFFLINE', '0').lower() in ('1', 'true', 'yes')
+
+
+def get_drivers_dir() -> Path:
+    """Return path to the folder BASE_DIR/drivers."""
+    return Path(set_new_folder_or_get_existent('drivers'))
+
+
+def get_browser_version(browser: Browser) -> str:
+    """Return version of the browser installed in OS (without network)."""
+    manager = OperationSystemManager()
+    version = manager.get_browser_version_from_os(browser_types[browser])
+    return version or UNKNOWN_VERSION
+
+
+def get_checksum(path: Path) -> str:
+    """Return sha256 of the file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_index() -> dict[str, dict[str, dict[str, str]]]:
+    """Return index {browser: {browser_version: {path, sha256}}}."""
+    index_path = get_drivers_dir() / INDEX_NAME
+    if not index_path.is_file():
+        return dict()
+    with open(index_path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def write_index(index: dict[str, dict[str, dict[str, str]]]) -> None:
+    """Save index atomically (several processes may resolve drivers)."""
+    index_path = get_drivers_dir() / INDEX_NAME
+    tmp_path = index_path.with_suffix(f'.{os.getpid()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(index, file, indent=4, sort_keys=True)
+    os.replace(tmp_path, index_path)
+
+
+def register_driver(
+    browser: Browser,
+    source: str | Path,
+    browser_version: str | None = None,
+) -> str:
+    """Copy driver binary into the cache and return path to the copy."""
+    source = Path(source)
+    if browser_version is None:
+        browser_version = get_browser_version(browser)
+
+    target_dir = get_drivers_dir() / browser / browser_version
+    target_dir.mkdir(parents=True, exist_ok=True)
+    target = target_dir / source.name
+    if source.resolve() != target.resolve():
+        tmp_target = target.with_suffix(f'.{os.getpid()}.tmp')
+        shutil.copy2(source, tmp_target)
+        os.replace(tmp_target, target)
+    target.chmod(target.stat().st_mode | stat.S_IXUSR)
+
+    index = read_index()
+    index.setdefault(browser, dict())[browser_version] = {
+        'path': str(target.relative_to(get_drivers_dir())),
+        'sha256': get_checksum(target),
+    }
+    write_index(index)
+    return str(target)
+
+
+def get_cached_driver(browser: Browser, browser_version: str) -> str | None:
+    """Return path to cached driver if it exists and checksum is valid."""
+    entry = read_index().get(browser, dict()).get(browser_version)
+    if entry is None:
+        return None
+    path = get_drivers_dir() / entry['path']
+    if not path.is_file() or get_checksum(path) != entry['sha256']:
+        return None
+    return str(path)
+
+
+def get_latest_cached_driver(browser: Browser) -> str | None:
+    """Return any valid cached driver starting from the last registered."""
+    versions = read_index().get(browser, dict())
+    for browser_version in reversed(list(versions)):
+        path = get_cached_driver(browser, browser_version)
+        if path is not None:
+            return path
+    return None
+
+
+def install_driver(browser: Browser) -> str:
+    """Download driver with webdriver_manager (uses network)."""
+    if browser == 'firefox':
+        return GeckoDriverManager().install()
+    return ChromeDriverManager().install()
+
+
+def resolve_driver(browser: Browser) -> str:
+    """Return path to driver matched to installed browser version.
+
+    The network is used only if the cache has no valid driver for the
+    installed browser version and DRIVERS_OFFLINE is not set.
+    """
+    browser_version = get_browser_version(browser)
+    path = get_cached_driver(browser, browser_version)
+    if path is not None:
+        return path
+
+    if not is_offline():
+        return register_driver(
+            browser, install_driver(browser), browser_version
+        )
+
+    # В закрытой сети лучше запуститься со старым драйвером чем упасть.
+    path = get_latest_cached_driver(browser)
+    if path is not None:
+        return path
+    raise FileNotFoundError(
+        f'Driver for {browser} {browser_version} not found in cache. '
+        f'Register it: python -m browser.driver_cache {browser} <path>'
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Register driver binary in the offline cache.'
+    )
+    parser.add_argument('browser', choices=list(browser_types))
+    parser.add_argument('path', help='Path to geckodriver / chromedriver.')
+    parser.add_argument('--browser-version', default=None)
+    args = parser.parse_args()
+    print(register_driver(args.browser, args.path, args.browser_version))
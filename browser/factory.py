@@ -0,0 +1,290 @@
+import atexit
+import copy
+import threading
+from contextlib import contextmanager
+from typing import Any
+from typing import Callable
+from typing import Iterator
+from typing import cast
+
+from selenium.webdriver import Chrome
+from selenium.webdriver import Firefox
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from selenium.webdriver.firefox.service import Service as FirefoxService
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from browser.driver_cache import resolve_driver
+from browser.instrumentation import instrument
+from browser.instrumentation import is_instrumentation_enabled
+from browser.lean import LeanProfile
+from browser.lean import apply_lean_chrome
+from browser.lean import apply_lean_firefox
+from browser.lean import block_urls
+from browser.profiles import delete_profile_clone
+from browser.profiles import get_profile_clone
+from config.settings import RunPreset
+from config.settings import get_run_preset
+
+
+def get_firefox_options(
+    *,
+    headless: bool | None = None,
+    private: bool = False,
+    devtools: bool | None = None,
+    width: int | None = None,
+    height: int | None = None,
+    profile_dir: str | None = None,
+    download_dir: str | None = None,
+    lean: LeanProfile | None = None,
+    bidi: bool = False,
+    preset: RunPreset | None = None,
+) -> FirefoxOptions:
+    """Return firefox options built from the passed parameters.
+
+    Parameters which are not passed are taken from the run preset
+    (RUN_PRESET, see config/settings.py).
+    """
+    if preset is None:
+        preset = get_run_preset()
+    options = FirefoxOptions()
+    options.page_load_strategy = preset.page_load_strategy
+    if preset.headless if headless is None else headless:
+        options.add_argument('--headless')
+    if private:
+        options.add_argument('--private-window')
+    if preset.devtools if devtools is None else devtools:
+        options.add_argument('--devtools')
+    options.add_argument(f'--width={width or preset.width}')
+    options.add_argument(f'--height={height or preset.height}')
+    if not preset.disk_cache:
+        options.set_preference('browser.cache.disk.enable', False)
+    if profile_dir is not None:
+        options.add_argument('--profile')
+        options.add_argument(profile_dir)
+    if download_dir is not None:
+        options.set_preference('browser.download.dir', download_dir)
+        options.set_preference('browser.download.folderList', 2)
+    if lean is None and preset.lean:
+        lean = LeanProfile()
+    if lean is not None:
+        apply_lean_firefox(options, lean)
+    if bidi:
+        # Сессия получит адрес websocket'а WebDriver BiDi (browser/bidi.py).
+        options.set_capability('webSocketUrl', True)
+    return options
+
+
+def get_chrome_options(
+    *,
+    headless: bool | None = None,
+    incognito: bool = False,
+    devtools: bool | None = None,
+    width: int | None = None,
+    height: int | None = None,
+    download_dir: str | None = None,
+    lean: LeanProfile | None = None,
+    preset: RunPreset | None = None,
+) -> ChromeOptions:
+    """Return google-chrome options built from the passed parameters.
+
+    Parameters which are not passed are taken from the run preset
+    (RUN_PRESET, see config/settings.py).
+    """
+    if preset is None:
+        preset = get_run_preset()
+    options = ChromeOptions()
+    options.page_load_strategy = preset.page_load_strategy
+    if preset.headless if headless is None else headless:
+        options.add_argument('--headless')
+    if incognito:
+        options.add_argument('--incognito')
+    if preset.devtools if devtools is None else devtools:
+        options.add_argument('--auto-open-devtools-for-tabs')
+    width, height = width or preset.width, height or preset.height
+    options.add_argument(f'--window-size={width},{height}')
+    if not preset.disk_cache:
+        options.add_argument('--disk-cache-size=1')
+    if download_dir is not None:
+        prefs = {
+            'download.default_directory': download_dir,
+            'download.prompt_for_download': False,
+            # Без этого второй файл страницы ждет ответа на вопрос
+            # "Скачать несколько файлов?".
+            'profile.default_content_setting_values.automatic_downloads': 1,
+        }
+        options.add_experimental_option('prefs', prefs)
+    if lean is None and preset.lean:
+        lean = LeanProfile()
+    if lean is not None:
+        apply_lean_chrome(options, lean)
+    return options
+
+
+def apply_timeouts(driver: WebDriver, preset: RunPreset) -> None:
+    driver.set_page_load_timeout(preset.page_load_timeout)
+    driver.set_script_timeout(preset.script_timeout)
+
+
+class ClonedProfileFirefox(Firefox):
+    """Firefox which deletes its profile clone when it quits."""
+
+    def __init__(
+        self,
+        profile_clone: str,
+        options: FirefoxOptions,
+        service: FirefoxService,
+    ) -> None:
+        self.profile_clone = profile_clone
+        super().__init__(options=options, service=service)
+
+    def quit(self) -> None:
+        try:
+            super().quit()
+        finally:
+            delete_profile_clone(self.profile_clone)
+
+
+def create_firefox(
+    options: FirefoxOptions | None = None,
+    preset: RunPreset | None = None,
+    profile: str | None = None,
+) -> Firefox:
+    """Start firefox with the cached geckodriver and preset timeouts.
+
+    With `profile` the browser gets a fresh clone of the profile template
+    BASE_DIR/<profile> (see browser/profiles.py), the clone is deleted when
+    the driver quits.
+    """
+    if preset is None:
+        preset = get_run_preset()
+    if options is None:
+        options = get_firefox_options(preset=preset)
+    service = FirefoxService(executable_path=resolve_driver('firefox'))
+    driver: Firefox
+    if profile is None:
+        driver = Firefox(options=options, service=service)
+    else:
+        # Копия профиля делается при запуске браузера, а не при импорте.
+        clone = get_profile_clone(profile)
+        options = copy.deepcopy(options)
+        options.add_argument('--profile')
+        options.add_argument(clone)
+        try:
+            driver = ClonedProfileFirefox(clone, options, service)
+        except BaseException:
+            delete_profile_clone(clone)
+            raise
+    apply_timeouts(driver, preset)
+    if is_instrumentation_enabled():
+        instrument(driver)
+    return driver
+
+
+def create_chrome(
+    options: ChromeOptions | None = None,
+    preset: RunPreset | None = None,
+    lean: LeanProfile | None = None,
+) -> Chrome:
+    """Start google-chrome with the cached chromedriver and preset timeouts.
+
+    With `lean` (or the lean preset) fonts and URL patterns of the profile
+    are blocked right after the start (see block_urls).
+    """
+    if preset is None:
+        preset = get_run_preset()
+    if options is None:
+        options = get_chrome_options(preset=preset, lean=lean)
+    if lean is None and preset.lean:
+        lean = LeanProfile()
+    service = ChromeService(executable_path=resolve_driver('chrome'))
+    driver = Chrome(options=options, service=service)
+    apply_timeouts(driver, preset)
+    if lean is not None and lean.get_patterns():
+        block_urls(driver, lean)
+    if is_instrumentation_enabled():
+        instrument(driver)
+    return driver
+
+
+@contextmanager
+def firefox_session(
+    options: FirefoxOptions | None = None,
+    preset: RunPreset | None = None,
+    profile: str | None = None,
+) -> Iterator[Firefox]:
+    """Start firefox and quit it on exit from the `with` block."""
+    driver = create_firefox(options, preset, profile)
+    try:
+        yield driver
+    finally:
+        driver.quit()
+
+
+@contextmanager
+def chrome_session(
+    options: ChromeOptions | None = None,
+    preset: RunPreset | None = None,
+    lean: LeanProfile | None = None,
+) -> Iterator[Chrome]:
+    """Start google-chrome and quit it on exit from the `with` block."""
+    driver = create_chrome(options, preset, lean)
+    try:
+        yield driver
+    finally:
+        driver.quit()
+
+
+class LazyDriver:
+    """Proxy which starts the browser on the first access to the driver."""
+
+    def __init__(self, factory: Callable[[], WebDriver]) -> None:
+        self._factory = factory
+        self._driver: WebDriver | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self._driver is not None
+
+    def get_driver(self) -> WebDriver:
+        """Return the driver, start the browser if it is not started yet."""
+        with self._lock:
+            if self._driver is None:
+                self._driver = self._factory()
+                atexit.register(self.quit)
+        return self._driver
+
+    def quit(self) -> None:
+        """Quit the browser if it was started."""
+        with self._lock:
+            driver, self._driver = self._driver, None
+        if driver is not None:
+            driver.quit()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.get_driver(), name)
+
+
+def lazy_firefox(
+    options: FirefoxOptions | None = None,
+    preset: RunPreset | None = None,
+    profile: str | None = None,
+) -> Firefox:
+    """Return firefox driver which starts on the first use."""
+    return cast(
+        Firefox,
+        LazyDriver(lambda: create_firefox(options, preset, profile)),
+    )
+
+
+def lazy_chrome(
+    options: ChromeOptions | None = None,
+    preset: RunPreset | None = None,
+    lean: LeanProfile | None = None,
+) -> Chrome:
+    """Return google-chrome driver which starts on the first use."""
+    return cast(
+        Chrome, LazyDriver(lambda: create_chrome(options, preset, lean))
+    )
@@ -0,0 +1,117 @@
+from typing import Collection
+from typing import Mapping
+
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from browser.locators import FIND_ELEMENT_JS
+from browser.locators import Locator
+
+
+# Функция `setValue(element, value)` для скриптов страницы: значение
+# ставится через родной сеттер прототипа (React и похожие библиотеки следят
+# за сеттером самого элемента). Сеттер ищется по цепочке прототипов, у
+# наследников HTMLInputElement его нет. Подставляется в начало скриптов
+# (browser/forms.py, browser/batch.py), события вызывающий код шлет сам.
+SET_VALUE_JS = '''
+var setValue = function (element, value) {
+    var proto = Object.getPrototypeOf(element);
+    while (proto && !Object.getOwnPropertyDescriptor(proto, 'value')) {
+        proto = Object.getPrototypeOf(proto);
+    }
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(element, value);
+};
+'''
+
+# Заполняет поля одним вызовом: значение ставится через setValue, затем
+# срабатывают события focus, input, change и blur как при вводе руками.
+# Поля для ввода с клавиатуры только очищаются и возвращаются как элементы.
+# Последнее поле остается в фокусе, после вызова можно нажать Enter.
+FILL_FORM_JS = (
+    FIND_ELEMENT_JS
+    + SET_VALUE_JS
+    + '''
+var fields = arguments[0], verify = arguments[1];
+var elements = [], missing = [], last = null;
+for (var i = 0; i < fields.length; i++) {
+    var element = find(fields[i][0], fields[i][1]);
+    elements.push(element);
+    if (element === null) {
+        missing.push(i);
+        continue;
+    }
+    var keys = fields[i][3];
+    element.focus();
+    setValue(element, keys ? '' : fields[i][2]);
+    element.dispatchEvent(new Event('input', {bubbles: true}));
+    element.dispatchEvent(new Event('change', {bubbles: true}));
+    element.blur();
+    last = element;
+}
+if (last !== null) {
+    last.focus();
+}
+var values = elements.map(function (element) {
+    return verify && element !== null ? element.value : null;
+});
+return [missing, values, elements];
+'''
+)
+
+# Значения полей для проверки после ввода с клавиатуры.
+GET_VALUES_JS = '''
+return arguments[0].map(function (element) {
+    return element.value;
+});
+'''
+
+
+def fill_form(
+    driver: WebDriver,
+    fields: Mapping[Locator, str],
+    keystrokes: Collection[Locator] = (),
+    expected: Mapping[Locator, str] | None = None,
+) -> None:
+    """Set values of all fields in one call and check them.
+
+    Fields of `keystrokes` (e.g. date inputs with masks) are typed with
+    real key events instead, all of them in one W3C Actions command. The
+    values are compared with `expected` or with `fields` and all wrong
+    fields are reported in one AssertionError.
+    """
+    for by, _ in fields:
+        if by not in ('xpath', 'css selector'):
+            raise ValueError(f'Locator {by=} is not supported.')
+    locators = list(fields)
+    payload = [
+        [*locator, fields[locator], locator in keystrokes]
+        for locator in locators
+    ]
+    # Без полей с клавиатуры проверка идет в этом же вызове.
+    missing, values, elements = driver.execute_script(
+        FILL_FORM_JS, payload, not keystrokes
+    )
+    if missing:
+        raise AssertionError(
+            'Fields not found: ' + ', '.join(str(locators[i]) for i in missing)
+        )
+    if keystrokes:
+        typed = [
+            (element, fields[locator])
+            for locator, element in zip(locators, elements)
+            if locator in keystrokes
+        ]
+        chain = ActionChains(driver, duration=0)
+        for element, value in typed:
+            chain.click(element).send_keys(value)
+        chain.perform()
+        values = driver.execute_script(GET_VALUES_JS, elements)
+
+    wanted = {**fields, **(expected or dict())}
+    wrong = [
+        f'{locator}: {value!r} != {wanted[locator]!r}'
+        for locator, value in zip(locators, values)
+        if value != wanted[locator]
+    ]
+    if wrong:
+        raise AssertionError('Wrong field values:\n' + '\n'.join(wrong))
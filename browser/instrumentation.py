@@ -0,0 +1,153 @@
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from types import CodeType
+from typing import Any
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+# Кадры этих модулей пропускаются при поиске вызвавшего команду хелпера:
+# весь пакет browser, что-бы команды новых модулей не попадали в отчет
+# под их внутренними функциями вместо вызвавшего их кода.
+SKIPPED_MODULES = ('selenium', 'browser.')
+UNKNOWN_HELPER = '<unknown>'
+
+
+def is_instrumentation_enabled() -> bool:
+    """Return True if drivers of the factory should be instrumented."""
+    value = os.getenv('WEBDRIVER_INSTRUMENTATION', '0')
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+class CommandStats:
+    """Count and time of WebDriver commands by the calling helper."""
+
+    def __init__(self) -> None:
+        # (helper, command) -> [count, total, max].
+        self._stats: dict[tuple[str, str], list[float]] = dict()
+        self._helpers: dict[CodeType, str | None] = dict()
+        self._lock = threading.Lock()
+
+    def get_helper(self, frame: Any) -> str:
+        """Return name of the first function outside of SKIPPED_MODULES."""
+        while frame is not None:
+            code = frame.f_code
+            if code in self._helpers:
+                helper = self._helpers[code]
+            else:
+                # Для каждой функции имя и решение считаются один раз.
+                module = frame.f_globals.get('__name__', '')
+                if module.startswith(SKIPPED_MODULES):
+                    helper = None
+                else:
+                    helper = f'{module}.{code.co_qualname}'
+                self._helpers[code] = helper
+            if helper is not None:
+                return helper
+            frame = frame.f_back
+        return UNKNOWN_HELPER
+
+    def record(self, helper: str, command: str, seconds: float) -> None:
+        key = (helper, command)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                self._stats[key] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                if seconds > stats[2]:
+                    stats[2] = seconds
+
+    def report(self) -> dict[str, dict[str, dict[str, float]]]:
+        """Return {helper: {command: {count, total, max}}}, slowest first."""
+        with self._lock:
+            items = sorted(
+                self._stats.items(), key=lambda item: item[1][1], reverse=True
+            )
+        report: dict[str, dict[str, dict[str, float]]] = dict()
+        for (helper, command), (count, total, maximum) in items:
+            report.setdefault(helper, dict())[command] = {
+                'count': int(count),
+                'total': total,
+                'max': maximum,
+            }
+        return report
+
+    def to_json(self) -> str:
+        return json.dumps(self.report(), indent=4)
+
+    def to_prometheus(self) -> str:
+        """Return stats in Prometheus text exposition format."""
+        with self._lock:
+            items = sorted(self._stats.items())
+        rows = [
+            (f'helper="{escape_label(h)}",command="{escape_label(c)}"', stats)
+            for (h, c), stats in items
+        ]
+        lines = [
+            '# HELP webdriver_command_seconds Time of WebDriver commands.',
+            '# TYPE webdriver_command_seconds summary',
+        ]
+        for labels, (count, total, _) in rows:
+            lines.append(
+                f'webdriver_command_seconds_count{{{labels}}} {count}'
+            )
+            lines.append(f'webdriver_command_seconds_sum{{{labels}}} {total}')
+        lines.append('# HELP webdriver_command_seconds_max Slowest command.')
+        lines.append('# TYPE webdriver_command_seconds_max gauge')
+        for labels, (_, _, maximum) in rows:
+            lines.append(
+                f'webdriver_command_seconds_max{{{labels}}} {maximum}'
+            )
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str | Path) -> None:
+        """Save stats atomically: *.prom as Prometheus text, else JSON."""
+        path = Path(path)
+        text = (
+            self.to_prometheus() if path.suffix == '.prom' else self.to_json()
+        )
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp_path.write_text(text, encoding='utf-8')
+        os.replace(tmp_path, path)
+
+
+def instrument(driver: WebDriver) -> CommandStats:
+    """Time every command sent by the driver's command executor.
+
+    Returns stats of the driver, repeated calls return the same stats.
+    """
+    executor = driver.command_executor
+    stats = get_stats(driver)
+    if stats is not None:
+        return stats
+    stats = CommandStats()
+    execute = executor.execute
+    perf_counter = time.perf_counter
+    get_frame = sys._getframe
+
+    def timed_execute(command: str, params: dict[str, Any]) -> Any:
+        start = perf_counter()
+        try:
+            return execute(command, params)
+        finally:
+            elapsed = perf_counter() - start
+            stats.record(stats.get_helper(get_frame(1)), command, elapsed)
+
+    executor.execute = timed_execute  # type: ignore[method-assign]
+    executor._command_stats = stats  # type: ignore[union-attr]
+    return stats
+
+
+def get_stats(driver: WebDriver) -> CommandStats | None:
+    """Return stats of the instrumented driver or None."""
+    return getattr(driver.command_executor, '_command_stats', None)
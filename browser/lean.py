@@ -0,0 +1,267 @@
+import argparse
+import base64
+import json
+import time
+from typing import Any
+from urllib.parse import urlparse
+from urllib.request import getproxies
+
+from pydantic import BaseModel
+from selenium.webdriver import Firefox
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.chromium.webdriver import ChromiumDriver
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from selenium.webdriver.firefox.service import Service
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from browser.driver_cache import resolve_driver
+
+
+TRACKER_HOSTS = (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'connect.facebook.net',
+    'mc.yandex.ru',
+    'an.yandex.ru',
+    'top-fwz1.mail.ru',
+    'counter.yadro.ru',
+)
+FONT_HOSTS = ('fonts.googleapis.com', 'fonts.gstatic.com')
+FONT_PATTERNS = ('*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot')
+IMAGE_PATTERNS = ('*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.ico')
+
+# Запросы к заблокированным хостам уходят в несуществующий прокси и сразу
+# завершаются ошибкой, хосты из NO_PROXY идут напрямую, остальные через прокси
+# из окружения (HTTPS_PROXY/HTTP_PROXY) или напрямую. Для https прокси-скрипт
+# видит только хост, поэтому типы ресурсов блокируются настройками браузера.
+PAC_TEMPLATE = '''
+function FindProxyForURL(url, host) {
+    var matches = function (hosts) {
+        for (var i = 0; i < hosts.length; i++) {
+            if (host === hosts[i] || dnsDomainIs(host, '.' + hosts[i])) {
+                return true;
+            }
+        }
+        return false;
+    };
+    if (matches(%s)) {
+        return 'PROXY 127.0.0.1:9';
+    }
+    if (matches(%s)) {
+        return 'DIRECT';
+    }
+    return %s;
+}
+'''
+# Сколько байт загрузила открытая страница (по данным Resource Timing).
+# Ресурсы других доменов без Timing-Allow-Origin имеют transferSize = 0.
+PAGE_BYTES_JS = '''
+var navigation = performance.getEntriesByType('navigation');
+var entries = navigation.concat(performance.getEntriesByType('resource'));
+var result = {
+    transfer: 0,
+    decoded: 0,
+    resources: entries.length,
+    load_time: navigation.length ? navigation[0].loadEventEnd : null,
+    by_type: {}
+};
+entries.forEach(function (entry) {
+    var size = entry.transferSize || 0;
+    var type = entry.initiatorType || 'navigation';
+    result.transfer += size;
+    result.decoded += entry.decodedBodySize || 0;
+    result.by_type[type] = (result.by_type[type] || 0) + size;
+});
+return result;
+'''
+
+
+class LeanProfile(BaseModel):
+    """What the lean profile blocks (True - block)."""
+
+    images: bool = True
+    fonts: bool = True
+    media: bool = True
+    trackers: bool = True
+    blocked_hosts: tuple[str, ...] = tuple()
+    # Шаблоны URL c `*`, блокируются только в google-chrome (block_urls).
+    blocked_patterns: tuple[str, ...] = tuple()
+    # Блокировать хосты прокси-скриптом (PAC). Прокси заданный в опциях
+    # браузера не заменяется, тогда хосты не блокируются.
+    pac: bool = True
+
+    def get_hosts(self) -> list[str]:
+        hosts = list(self.blocked_hosts)
+        if self.trackers:
+            hosts.extend(TRACKER_HOSTS)
+        if self.fonts:
+            hosts.extend(FONT_HOSTS)
+        return hosts
+
+    def get_patterns(self) -> list[str]:
+        patterns = list(self.blocked_patterns)
+        if self.fonts:
+            patterns.extend(FONT_PATTERNS)
+        if self.images:
+            patterns.extend(IMAGE_PATTERNS)
+        return patterns
+
+
+def get_upstream_proxy() -> str | None:
+    """Return host:port of proxy from HTTPS_PROXY/HTTP_PROXY variables."""
+    proxies = getproxies()
+    url = proxies.get('https') or proxies.get('http')
+    if not url:
+        return None
+    return urlparse(url if '://' in url else f'http://{url}').netloc or None
+
+
+def get_no_proxy() -> list[str]:
+    """Return hosts from NO_PROXY variable (`*` - all hosts)."""
+    hosts = []
+    for host in getproxies().get('no', '').split(','):
+        host = host.strip()
+        if host != '*':
+            # В FindProxyForURL нет порта, а домен сравнивается с точкой.
+            host = host.rsplit(':', 1)[0] if host.count(':') == 1 else host
+            host = host.lstrip('*.')
+        if host:
+            hosts.append(host)
+    return hosts
+
+
+def get_pac_url(
+    hosts: list[str],
+    upstream: str | None = None,
+    direct: list[str] | None = None,
+) -> str:
+    """Return data: URL of proxy auto-config which blocks `hosts`.
+
+    Requests to `direct` hosts go directly, other go through `upstream`
+    (host:port) or directly too.
+    """
+    direct = list(direct or [])
+    if '*' in direct:
+        upstream, direct = None, []
+    fallback = 'DIRECT' if upstream is None else f'PROXY {upstream}'
+    script = PAC_TEMPLATE % (
+        json.dumps(hosts),
+        json.dumps(direct),
+        json.dumps(fallback),
+    )
+    encoded = base64.b64encode(script.encode()).decode()
+    return f'data:application/x-ns-proxy-autoconfig;base64,{encoded}'
+
+
+def apply_lean_firefox(options: FirefoxOptions, profile: LeanProfile) -> None:
+    """Add preferences of the lean profile to firefox options.
+
+    Blocked hosts replace proxy settings of the profile with a PAC which
+    passes other requests to the HTTPS_PROXY/HTTP_PROXY proxy (or directly,
+    for NO_PROXY hosts). Options with their own proxy are left as is.
+    """
+    if profile.images:
+        options.set_preference('permissions.default.image', 2)
+    if profile.fonts:
+        options.set_preference('gfx.downloadable_fonts.enabled', False)
+        options.set_preference('browser.display.use_document_fonts', 0)
+    if profile.media:
+        options.set_preference('media.autoplay.default', 5)
+        options.set_preference('media.preload.default', 0)
+    if profile.trackers:
+        options.set_preference('privacy.trackingprotection.enabled', True)
+    options.set_preference('network.prefetch-next', False)
+    options.set_preference('network.dns.disablePrefetch', True)
+    hosts = profile.get_hosts()
+    has_proxy = (
+        options.proxy is not None
+        or 'network.proxy.type' in options.preferences
+    )
+    if hosts and profile.pac and not has_proxy:
+        options.set_preference('network.proxy.type', 2)
+        options.set_preference(
+            'network.proxy.autoconfig_url',
+            get_pac_url(hosts, get_upstream_proxy(), get_no_proxy()),
+        )
+
+
+def apply_lean_chrome(options: ChromeOptions, profile: LeanProfile) -> None:
+    """Add preferences of the lean profile to google-chrome options.
+
+    Fonts and `blocked_patterns` are blocked after start by block_urls.
+    Proxy is handled as in apply_lean_firefox.
+    """
+    prefs = dict(options.experimental_options.get('prefs', dict()))
+    if profile.images:
+        prefs['profile.managed_default_content_settings.images'] = 2
+    options.add_experimental_option('prefs', prefs)
+    if profile.media:
+        options.add_argument('--autoplay-policy=user-gesture-required')
+    options.add_argument('--dns-prefetch-disable')
+    hosts = profile.get_hosts()
+    has_proxy = options.proxy is not None or any(
+        argument.startswith(('--proxy-server', '--proxy-pac-url'))
+        for argument in options.arguments
+    )
+    if hosts and profile.pac and not has_proxy:
+        pac_url = get_pac_url(hosts, get_upstream_proxy(), get_no_proxy())
+        options.add_argument(f'--proxy-pac-url={pac_url}')
+
+
+def block_urls(driver: WebDriver, profile: LeanProfile) -> None:
+    """Block URL patterns of the profile in google-chrome (CDP)."""
+    if not isinstance(driver, ChromiumDriver):
+        raise TypeError('URL patterns can be blocked only in chromium.')
+    driver.execute_cdp_cmd('Network.enable', dict())
+    driver.execute_cdp_cmd(
+        'Network.setBlockedURLs', {'urls': profile.get_patterns()}
+    )
+
+
+def get_page_bytes(driver: WebDriver) -> dict[str, Any]:
+    """Return bytes loaded by the opened page by initiator type."""
+    return driver.execute_script(PAGE_BYTES_JS)
+
+
+def compare_page_bytes(
+    url: str,
+    full_driver: WebDriver,
+    lean_driver: WebDriver,
+) -> dict[str, Any]:
+    """Open `url` with both drivers and return how much lean one saved."""
+    result: dict[str, Any] = {'url': url}
+    for name, driver in (('full', full_driver), ('lean', lean_driver)):
+        start = time.perf_counter()
+        driver.get(url)
+        elapsed = time.perf_counter() - start
+        result[name] = {**get_page_bytes(driver), 'get_time': elapsed}
+    result['saved'] = result['full']['transfer'] - result['lean']['transfer']
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Show bytes saved by the lean profile on each page.'
+    )
+    parser.add_argument('urls', nargs='+')
+    args = parser.parse_args()
+
+    # browser.factory импортирует этот модуль, поэтому браузеры создаются
+    # здесь напрямую.
+    lean_options = FirefoxOptions()
+    lean_options.add_argument('--headless')
+    apply_lean_firefox(lean_options, LeanProfile())
+    full_options = FirefoxOptions()
+    full_options.add_argument('--headless')
+    drivers = [
+        Firefox(options=options, service=Service(resolve_driver('firefox')))
+        for options in (full_options, lean_options)
+    ]
+    try:
+        for url in args.urls:
+            report = compare_page_bytes(url, *drivers)
+            print(json.dumps(report, indent=4))
+    finally:
+        for driver in drivers:
+            driver.quit()
@@ -0,0 +1,145 @@
+from typing import Any
+from typing import Callable
+from typing import Iterator
+from typing import Sequence
+from typing import overload
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+from browser.locators import Locator
+from browser.waits import READINESS_PROBE_JS
+
+
+# Ставит пробу (счетчик изменений DOM) и возвращает версию DOM и количество
+# элементов локатора, сами элементы при этом не передаются.
+LIVE_STATE_JS = (
+    READINESS_PROBE_JS
+    + '''
+var by = arguments[0], value = arguments[1];
+var count = by === 'xpath'
+    ? document.evaluate(
+        value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+    ).snapshotLength
+    : document.querySelectorAll(value).length;
+return [performance.timeOrigin, window.__readiness.mutations, count];
+'''
+)
+
+
+class LiveElement:
+    """Element of LiveElements, a stale element is found again once.
+
+    After the new search the element with the same index is taken,
+    NoSuchElementException is raised if there are fewer elements now.
+    """
+
+    def __init__(
+        self,
+        collection: 'LiveElements',
+        index: int,
+        element: WebElement,
+    ) -> None:
+        self._collection = collection
+        self._index = index
+        self._element = element
+
+    def _retry(self, get: Callable[[WebElement], Any]) -> Any:
+        try:
+            return get(self._element)
+        except StaleElementReferenceException:
+            elements = self._collection.resolve()
+            if self._index >= len(elements):
+                # После изменения DOM элементов стало меньше.
+                raise NoSuchElementException(
+                    f'Element {self._index} of {self._collection.locator} '
+                    f'is gone, {len(elements)} elements found again.'
+                )
+            self._element = elements[self._index]
+            return get(self._element)
+
+    def __getattr__(self, name: str) -> Any:
+        value = self._retry(lambda element: getattr(element, name))
+        if not callable(value):
+            return value
+
+        def method(*args: Any, **kwargs: Any) -> Any:
+            return self._retry(
+                lambda element: getattr(element, name)(*args, **kwargs)
+            )
+
+        return method
+
+    def __repr__(self) -> str:
+        return f'LiveElement({self._collection.locator}, {self._index})'
+
+
+class LiveElements(Sequence[LiveElement]):
+    """Elements of the locator which are found again when DOM changes.
+
+    Each access asks the page for the DOM version (one small script). If
+    DOM has changed since the last search, elements are searched again.
+    `len()` is counted in the page without fetching the elements.
+    """
+
+    def __init__(self, driver: WebDriver, locator: Locator) -> None:
+        if locator[0] not in ('xpath', 'css selector'):
+            raise ValueError(f'Locator {locator[0]!r} is not supported.')
+        self.driver = driver
+        self.locator = locator
+        self._version: tuple[float, int] | None = None
+        self._elements: list[WebElement] = list()
+        self.searches = 0
+
+    def _get_state(self) -> tuple[tuple[float, int], int]:
+        time_origin, mutations, count = self.driver.execute_script(
+            LIVE_STATE_JS, *self.locator
+        )
+        return (time_origin, mutations), count
+
+    def resolve(
+        self, version: tuple[float, int] | None = None
+    ) -> list[WebElement]:
+        """Search elements again and remember the DOM version."""
+        if version is None:
+            version, _ = self._get_state()
+        self._version = version
+        self._elements = self.driver.find_elements(*self.locator)
+        self.searches += 1
+        return self._elements
+
+    def _get_elements(self) -> list[WebElement]:
+        version, _ = self._get_state()
+        if version != self._version:
+            return self.resolve(version)
+        return self._elements
+
+    def __len__(self) -> int:
+        _, count = self._get_state()
+        return count
+
+    @overload
+    def __getitem__(self, index: int) -> LiveElement:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[LiveElement]:
+        ...
+
+    def __getitem__(
+        self, index: int | slice
+    ) -> LiveElement | list[LiveElement]:
+        elements = self._get_elements()
+        if isinstance(index, slice):
+            indexes = range(len(elements))[index]
+            return [LiveElement(self, i, elements[i]) for i in indexes]
+        if index < 0:
+            index += len(elements)
+        return LiveElement(self, index, elements[index])
+
+    def __iter__(self) -> Iterator[LiveElement]:
+        # Снимок на момент начала обхода, устаревшие элементы
+        # находятся заново при обращении к ним.
+        return iter(self[:])
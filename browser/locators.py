@@ -0,0 +1,153 @@
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any
+from typing import Callable
+from typing import Iterator
+
+from pydantic import BaseModel
+from pydantic import computed_field
+from selenium.webdriver.support.wait import WebDriverWait
+
+
+Locator = tuple[str, str]
+
+# Функция `find(by, value)` для скриптов страницы: первый элемент локатора
+# 'xpath' или 'css selector', null если элемента нет. Подставляется в начало
+# скриптов (browser/waits.py, browser/forms.py, browser/batch.py).
+FIND_ELEMENT_JS = '''
+var find = function (by, value) {
+    return by === 'xpath'
+        ? document.evaluate(
+            value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+        ).singleNodeValue
+        : document.querySelector(value);
+};
+'''
+
+# //tag[@attr="value"] можно заменить на CSS селектор tag[attr="value"],
+# браузер находит элементы по CSS быстрее чем по xpath.
+simple_xpath_regex = re.compile(
+    r'''^//(?P<tag>[A-Za-z][\w-]*|\*)'''
+    r'''\[@(?P<attr>[A-Za-z_][\w-]*)=(?:'(?P<v1>[^']*)'|"(?P<v2>[^"]*)")\]$'''
+)
+name_regex = re.compile(r'^[A-Za-z_][\w.-]*$')
+
+
+def xpath_literal(value: str) -> str:
+    """Return value as XPath string literal, quotes inside are allowed."""
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    # Строка с обоими видами кавычек: 'a"b'c' -> concat('a"b', "'", 'c').
+    parts = [f"'{part}'" for part in value.split("'")]
+    return 'concat(' + ', "\'", '.join(parts) + ')'
+
+
+def xpath_to_css(xpath: str) -> str | None:
+    """Return CSS selector equal to xpath or None if there is no such."""
+    match = simple_xpath_regex.match(xpath)
+    if match is None:
+        return None
+    tag = '' if match['tag'] == '*' else match['tag']
+    value = match['v1'] if match['v1'] is not None else match['v2']
+    value = value.replace('\\', '\\\\').replace('"', '\\"')
+    return f'{tag}[{match["attr"]}="{value}"]'
+
+
+class LocatorStats(BaseModel):
+    count: int = 0
+    total: float = 0
+    max: float = 0
+
+    @computed_field  # type: ignore[misc]
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0
+
+
+class LocatorRegistry:
+    """Locator templates declared once, rendered once and timed on use.
+
+    Template parameters are inserted as escaped XPath literals, parameters
+    listed in `raw` are inserted as is (only names like `id` are allowed).
+    """
+
+    def __init__(self) -> None:
+        self._templates: dict[str, tuple[str, tuple[str, ...]]] = dict()
+        self._cache: dict[tuple[Any, ...], Locator] = dict()
+        self._stats: dict[str, LocatorStats] = dict()
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        template: str,
+        raw: tuple[str, ...] = tuple(),
+    ) -> None:
+        """Declare locator template with `{param}` placeholders."""
+        if name in self._templates:
+            raise ValueError(f'Locator {name!r} is already registered.')
+        self._templates[name] = (template, raw)
+        self._stats[name] = LocatorStats()
+
+    def get(self, name: str, **params: str) -> Locator:
+        """Return (by, value) locator, rendered strings are interned."""
+        key = (name, *sorted(params.items()))
+        locator = self._cache.get(key)
+        if locator is not None:
+            return locator
+
+        template, raw = self._templates[name]
+        values = dict()
+        for param, value in params.items():
+            if param not in raw:
+                values[param] = xpath_literal(value)
+            elif name_regex.match(value):
+                values[param] = value
+            else:
+                raise ValueError(f'Invalid value of {param=}: {value!r}.')
+        xpath = template.format(**values)
+        css = xpath_to_css(xpath)
+        if css is not None:
+            locator = ('css selector', sys.intern(css))
+        else:
+            locator = ('xpath', sys.intern(xpath))
+        self._cache[key] = locator
+        return locator
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[None]:
+        """Count usage of the locator and time the `with` block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stats = self._stats[name]
+                stats.count += 1
+                stats.total += elapsed
+                stats.max = max(stats.max, elapsed)
+
+    def until(
+        self,
+        wait: WebDriverWait,
+        condition: Callable[[Locator], Callable[[Any], Any]],
+        name: str,
+        **params: str,
+    ) -> Any:
+        """Wait `condition(locator)` and count the time in stats."""
+        locator = self.get(name, **params)
+        with self.track(name):
+            return wait.until(condition(locator))
+
+    def report(self) -> dict[str, dict[str, float]]:
+        """Return stats of used locators, the slowest first."""
+        with self._lock:
+            used = [(n, s) for n, s in self._stats.items() if s.count]
+        used.sort(key=lambda item: item[1].total, reverse=True)
+        return {name: stats.model_dump() for name, stats in used}
@@ -0,0 +1,189 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable
+from typing import Iterator
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chromium.webdriver import ChromiumDriver
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from browser.bidi import open_bidi
+
+
+CLEAR_STORAGE_SCRIPT = '''
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+'''
+
+
+async def _delete_all_cookies(driver: WebDriver) -> None:
+    async with open_bidi(driver) as connection:
+        await connection.send('storage.deleteCookies', dict())
+
+
+def has_bidi(driver: WebDriver) -> bool:
+    """Return True if the session was started with `webSocketUrl`."""
+    return isinstance(driver.capabilities.get('webSocketUrl'), str)
+
+
+def can_reset(driver: WebDriver) -> bool:
+    """Return True if reset_session clears cookies of all domains."""
+    return isinstance(driver, ChromiumDriver) or has_bidi(driver)
+
+
+def reset_session(driver: WebDriver) -> None:
+    """Bring the session close to the state of a just started browser.
+
+    Closes all windows except the first one, clears cookies, localStorage and
+    sessionStorage and opens about:blank. Cookies of all domains are cleared
+    in google-chrome (CDP) and in firefox started with BiDi
+    (get_firefox_options(bidi=True)), otherwise only of the current page's
+    origin (see can_reset). Storage is cleared only for the current origin.
+    """
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+
+    if isinstance(driver, ChromiumDriver):
+        # Через CDP можно очистить куки всех доменов, а не только текущего.
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', dict())
+    elif has_bidi(driver):
+        asyncio.run(_delete_all_cookies(driver))
+    else:
+        driver.delete_all_cookies()
+    driver.execute_script(CLEAR_STORAGE_SCRIPT)
+    driver.get('about:blank')
+
+
+class SessionPool:
+    """Pool of started browsers handed out to jobs and reset between them.
+
+    With `recreate` each session is replaced by a new browser after the job
+    instead of the reset (full isolation, but a browser start per job). By
+    default sessions which can't be fully reset (see can_reset) are
+    replaced, the others are reset.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], WebDriver],
+        size: int,
+        recreate: bool | None = None,
+    ) -> None:
+        if size < 1:
+            raise ValueError(f'Pool size must be >= 1, got {size=}')
+        self.factory = factory
+        self.size = size
+        self.recreate = recreate
+        self._idle: queue.Queue[WebDriver] = queue.Queue()
+        self._sessions: list[WebDriver] = list()
+        # Слоты, браузер которых не удалось запустить заново.
+        self._missing = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> 'SessionPool':
+        self.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def _create(self) -> WebDriver:
+        driver = self.factory()
+        with self._lock:
+            self._sessions.append(driver)
+        return driver
+
+    def _discard(self, driver: WebDriver) -> None:
+        with self._lock:
+            if driver in self._sessions:
+                self._sessions.remove(driver)
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    def start(self) -> None:
+        """Start all browsers of the pool in parallel.
+
+        If any browser fails to start, the started ones are quit and the
+        error is raised.
+        """
+        missing = self.size - len(self._sessions)
+        with ThreadPoolExecutor(max_workers=max(missing, 1)) as executor:
+            futures = [executor.submit(self._create) for _ in range(missing)]
+        errors = [f.exception() for f in futures]
+        drivers = [
+            f.result() for f, error in zip(futures, errors) if error is None
+        ]
+        for error in errors:
+            if error is not None:
+                for driver in drivers:
+                    self._discard(driver)
+                raise error
+        for driver in drivers:
+            self._idle.put(driver)
+
+    def _replace(self, driver: WebDriver) -> None:
+        self._discard(driver)
+        try:
+            self._idle.put(self._create())
+        except Exception:
+            # Ошибка запуска не должна скрыть ошибку задачи, слот будет
+            # заполнен при следующем запросе сессии.
+            with self._lock:
+                self._missing += 1
+
+    def _refill(self) -> None:
+        with self._lock:
+            missing, self._missing = self._missing, 0
+        failed, error = 0, None
+        for _ in range(missing):
+            try:
+                self._idle.put(self._create())
+            except Exception as exception:
+                failed, error = failed + 1, exception
+        with self._lock:
+            self._missing += failed
+        # Без свободных сессий ожидание бессмысленно - сообщаем о причине.
+        if error is not None and self._idle.empty():
+            raise error
+
+    @contextmanager
+    def session(self, timeout: float | None = None) -> Iterator[WebDriver]:
+        """Take a warm session for the job and return it reset afterwards."""
+        self._refill()
+        driver = self._idle.get(timeout=timeout)
+        try:
+            yield driver
+        finally:
+            recreate = self.recreate
+            if recreate is None:
+                recreate = not can_reset(driver)
+            if recreate:
+                self._replace(driver)
+            else:
+                try:
+                    reset_session(driver)
+                except Exception:
+                    # Сессия сломана (браузер упал и т.п.) - заменяем новой.
+                    self._replace(driver)
+                else:
+                    self._idle.put(driver)
+
+    def close(self) -> None:
+        """Quit all browsers of the pool."""
+        with self._lock:
+            sessions, self._sessions = self._sessions, list()
+        for driver in sessions:
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+        while not self._idle.empty():
+            self._idle.get_nowait()
@@ -0,0 +1,261 @@
+import argparse
+import atexit
+import fcntl
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from config.settings import set_new_folder_or_get_existent
+
+
+# Кэши, история сессий, отчеты о падениях и телеметрия: браузер создаст их
+# заново, а в шаблоне они только замедляют копирование профиля.
+PRUNED_ENTRIES = (
+    'cache2',
+    'startupCache',
+    'thumbnails',
+    'shader-cache',
+    'safebrowsing',
+    'crashes',
+    'minidumps',
+    'datareporting',
+    'saved-telemetry-pings',
+    'sessionstore-backups',
+    'sessionstore.jsonlz4',
+    'storage/temporary',
+    'lock',
+    '.parentlock',
+    'parent.lock',
+)
+COMPACTED_STAMP = '.compacted'
+CLONE_PREFIX = 'firefox-profile-'
+# ioctl FICLONE: копия файла которая делит блоки с оригиналом (btrfs, xfs).
+FICLONE = 0x40049409
+
+
+def get_clone_root() -> str:
+    """Return /dev/shm (tmpfs) if it is available, else temp directory."""
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+    return tempfile.gettempdir()
+
+
+def copy_file(source: Path, target: Path) -> None:
+    """Copy file as reflink if the filesystem supports it."""
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+    # Шаблон только для чтения, копия должна быть доступна на запись.
+    os.chmod(target, 0o644)
+
+
+def is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Процесс есть, но принадлежит другому пользователю.
+        return True
+    return True
+
+
+def set_writable(directory: Path, writable: bool) -> None:
+    mode = 0o644 if writable else 0o444
+    for root, _, files in os.walk(directory):
+        for name in files:
+            os.chmod(os.path.join(root, name), mode)
+
+
+class ProfileManager:
+    """Read-only profile template cloned for each browser session.
+
+    Each session gets its own copy on tmpfs, so concurrent runs don't fight
+    over the profile lock and the template doesn't grow. Hardlinks are not
+    used: Firefox changes its databases in place and would change the
+    template too.
+    """
+
+    def __init__(
+        self,
+        template_dir: str,
+        clone_root: str | None = None,
+        compact_every: float = 7 * 24 * 60 * 60,
+    ) -> None:
+        self.template_dir = Path(template_dir)
+        self.template_dir.mkdir(parents=True, exist_ok=True)
+        self.clone_root = clone_root or get_clone_root()
+        self.compact_every = compact_every
+        self.lock_path = self.template_dir.with_name(
+            self.template_dir.name + '.lock'
+        )
+        self.clones: set[str] = set()
+        self._stale_deleted = False
+        atexit.register(self.delete_all)
+
+    @contextmanager
+    def _locked(self, operation: int) -> Iterator[None]:
+        # Клонирование - общая блокировка, сжатие шаблона - исключительная.
+        with open(self.lock_path, 'a') as lock:
+            fcntl.flock(lock, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def clone(self) -> str:
+        """Copy template to a new directory and return its path."""
+        if not self._stale_deleted:
+            self.delete_stale()
+            self._stale_deleted = True
+        self.compact()
+        # PID в имени копии - что-бы найти копии упавших процессов.
+        path = tempfile.mkdtemp(
+            prefix=f'{CLONE_PREFIX}{os.getpid()}-', dir=self.clone_root
+        )
+        with self._locked(fcntl.LOCK_SH):
+            for root, dirs, files in os.walk(self.template_dir):
+                relative = Path(root).relative_to(self.template_dir)
+                target = Path(path, relative)
+                for name in dirs:
+                    (target / name).mkdir()
+                for name in files:
+                    if name != COMPACTED_STAMP:
+                        copy_file(Path(root, name), target / name)
+        self.clones.add(path)
+        return path
+
+    def delete(self, path: str) -> None:
+        shutil.rmtree(path, ignore_errors=True)
+        self.clones.discard(path)
+
+    def delete_all(self) -> None:
+        for path in list(self.clones):
+            self.delete(path)
+
+    def delete_stale(self) -> list[str]:
+        """Delete clones left by processes which are not running anymore.
+
+        atexit doesn't run in killed or crashed processes, and their clones
+        would stay in /dev/shm (in RAM). Returns paths of deleted clones.
+        """
+        deleted = list()
+        for path in Path(self.clone_root).glob(f'{CLONE_PREFIX}*'):
+            pid = path.name[len(CLONE_PREFIX) :].split('-', 1)[0]
+            if not pid.isdigit() or is_process_alive(int(pid)):
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            deleted.append(str(path))
+        return deleted
+
+    @contextmanager
+    def session(self) -> Iterator[str]:
+        """Clone the template and delete the clone on exit from the block."""
+        path = self.clone()
+        try:
+            yield path
+        finally:
+            self.delete(path)
+
+    def needs_compaction(self) -> bool:
+        stamp = self.template_dir / COMPACTED_STAMP
+        if not stamp.is_file():
+            return True
+        return time.time() - stamp.stat().st_mtime > self.compact_every
+
+    def compact(self, force: bool = False) -> bool:
+        """Prune caches and history of the template and vacuum databases.
+
+        Runs once in `compact_every` seconds unless forced, returns True
+        if the template was compacted.
+        """
+        if not force and not self.needs_compaction():
+            return False
+        with self._locked(fcntl.LOCK_EX):
+            set_writable(self.template_dir, True)
+            for entry in PRUNED_ENTRIES:
+                path = self.template_dir / entry
+                if path.is_dir():
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    path.unlink(missing_ok=True)
+            for database in self.template_dir.glob('*.sqlite'):
+                connection = sqlite3.connect(database)
+                try:
+                    connection.execute('VACUUM')
+                except sqlite3.DatabaseError:
+                    # Поврежденную или чужую базу пропускаем.
+                    pass
+                finally:
+                    connection.close()
+            (self.template_dir / COMPACTED_STAMP).touch()
+            set_writable(self.template_dir, False)
+        return True
+
+    def replace_template(self, profile_dir: str) -> None:
+        """Make a copy of the profile directory the new template."""
+        with self._locked(fcntl.LOCK_EX):
+            set_writable(self.template_dir, True)
+            shutil.rmtree(self.template_dir)
+            shutil.copytree(profile_dir, self.template_dir)
+        self.compact(force=True)
+
+    def get_size(self) -> int:
+        return sum(
+            path.stat().st_size
+            for path in self.template_dir.rglob('*')
+            if path.is_file()
+        )
+
+
+_managers: dict[str, ProfileManager] = dict()
+
+
+def get_profile_clone(name: str = 'firefox_profile') -> str:
+    """Return fresh clone of the template BASE_DIR/<name>.
+
+    The clone is deleted by delete_profile_clone or when Python exits.
+    """
+    if name not in _managers:
+        _managers[name] = ProfileManager(set_new_folder_or_get_existent(name))
+    return _managers[name].clone()
+
+
+def delete_profile_clone(path: str) -> None:
+    """Delete clone returned by get_profile_clone."""
+    for manager in _managers.values():
+        if path in manager.clones:
+            manager.delete(path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Compact profile template and measure clone time.'
+    )
+    parser.add_argument('name', nargs='?', default='firefox_profile')
+    parser.add_argument(
+        '--from',
+        dest='source',
+        default=None,
+        help='Profile directory which becomes the new template.',
+    )
+    args = parser.parse_args()
+
+    manager = ProfileManager(set_new_folder_or_get_existent(args.name))
+    for path in manager.delete_stale():
+        print(f'Deleted stale clone {path}.')
+    if args.source is not None:
+        manager.replace_template(args.source)
+    size = manager.get_size()
+    manager.compact(force=True)
+    print(f'Template: {size} -> {manager.get_size()} bytes.')
+    start = time.perf_counter()
+    with manager.session() as path:
+        print(f'Cloned to {path} in {time.perf_counter() - start:.3f}s.')
@@ -0,0 +1,135 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from cryptography.fernet import Fernet
+from cryptography.fernet import InvalidToken
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+# Переменная окружения с ключом шифрования. Ключ не хранится рядом с
+# сессией, иначе файл сессии расшифрует любой, кто может его прочитать.
+# Создать ключ: python -c "from cryptography.fernet import Fernet;
+# print(Fernet.generate_key().decode())"
+KEY_ENV = 'SESSION_STORE_KEY'
+
+GET_LOCAL_STORAGE_JS = 'return Object.assign({}, window.localStorage);'
+SET_LOCAL_STORAGE_JS = '''
+var items = arguments[0];
+for (var key in items) {
+    window.localStorage.setItem(key, items[key]);
+}
+'''
+# Один запрос страницы с куками текущей сессии, без перехода на нее.
+# Возвращает true если в ответе нет `marker` (признака гостя).
+PROBE_SESSION_JS = '''
+var url = arguments[0];
+var marker = arguments[1];
+var done = arguments[arguments.length - 1];
+fetch(url, {credentials: 'include', cache: 'no-store'})
+    .then(function (response) { return response.text(); })
+    .then(function (text) { done(text.indexOf(marker) === -1); })
+    .catch(function () { done(false); });
+'''
+
+
+def has_key() -> bool:
+    return bool(os.getenv(KEY_ENV))
+
+
+def get_key() -> bytes:
+    """Return encryption key from SESSION_STORE_KEY variable."""
+    key = os.getenv(KEY_ENV)
+    if not key:
+        raise RuntimeError(
+            f'Set {KEY_ENV} to a key from Fernet.generate_key() to save '
+            'sessions.'
+        )
+    return key.encode()
+
+
+def is_session_valid(driver: WebDriver, url: str, marker: str) -> bool:
+    """Return True if `url` fetched with current cookies has no `marker`."""
+    try:
+        return bool(driver.execute_async_script(PROBE_SESSION_JS, url, marker))
+    except WebDriverException:
+        return False
+
+
+class SessionStore:
+    """Cookies and localStorage of one site saved to an encrypted file."""
+
+    def __init__(self, path: str | Path, max_age: float = 7 * 24 * 3600):
+        self.path = Path(path)
+        self.max_age = max_age
+        self.fernet = Fernet(get_key())
+
+    def save(self, driver: WebDriver) -> None:
+        """Save session of the site opened in the driver."""
+        data = {
+            'saved_at': time.time(),
+            'cookies': driver.get_cookies(),
+            'local_storage': driver.execute_script(GET_LOCAL_STORAGE_JS),
+        }
+        token = self.fernet.encrypt(json.dumps(data).encode())
+        tmp_path = self.path.with_suffix(f'.{os.getpid()}.tmp')
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as file:
+            file.write(token)
+        os.replace(tmp_path, self.path)
+
+    def load(self) -> dict[str, Any] | None:
+        """Return saved session or None if it is absent, broken or old."""
+        if not self.path.is_file():
+            return None
+        try:
+            data = json.loads(self.fernet.decrypt(self.path.read_bytes()))
+        except (InvalidToken, ValueError):
+            return None
+        if time.time() - data['saved_at'] > self.max_age:
+            return None
+        return data
+
+    def restore(self, driver: WebDriver, url: str) -> bool:
+        """Open `url` and put the saved session into it.
+
+        Returns False if there is nothing to restore or the browser rejected
+        the session (then it is discarded). Whether the session is still
+        alive on the server should be checked by is_session_valid.
+        """
+        data = self.load()
+        if data is None:
+            return False
+        try:
+            # Куки можно добавить только для домена открытой страницы.
+            driver.get(url)
+            now = time.time()
+            for cookie in data['cookies']:
+                # Куки без expiry живут до закрытия браузера.
+                if cookie.get('expiry', now) < now:
+                    continue
+                driver.add_cookie(cookie)
+            driver.execute_script(SET_LOCAL_STORAGE_JS, data['local_storage'])
+        except WebDriverException:
+            # Например кука другого домена (сайт переехал) - часть сессии
+            # уже добавлена, убираем ее и входим заново.
+            self.discard(driver)
+            return False
+        return True
+
+    def discard(self, driver: WebDriver) -> None:
+        """Remove restored session from the browser and delete the file.
+
+        Called when the restored session is dead, before logging in again.
+        """
+        try:
+            driver.delete_all_cookies()
+            driver.execute_script('window.localStorage.clear();')
+        finally:
+            self.clear()
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
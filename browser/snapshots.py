@@ -0,0 +1,261 @@
+import argparse
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import zstandard
+from pydantic import BaseModel
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    current_url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access);
+CREATE INDEX IF NOT EXISTS pages_content_hash ON pages (content_hash);
+CREATE TABLE IF NOT EXISTS blobs (
+    content_hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS totals (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO totals (name, value)
+SELECT 'bytes', COALESCE(SUM(size), 0) FROM blobs;
+'''
+
+# Адрес, заголовок и HTML страницы одним вызовом вместо трех команд.
+SNAPSHOT_JS = '''
+return [document.URL, document.title, document.documentElement.outerHTML];
+'''
+
+
+class Snapshot(BaseModel):
+    url: str
+    current_url: str
+    title: str
+    html: str
+    content_hash: str
+    created: float
+
+
+class SnapshotCache:
+    """Page sources compressed with zstd and stored in SQLite by url.
+
+    Equal pages (same content hash) are stored once. When compressed data
+    is bigger than `max_bytes`, least recently read pages are evicted.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        level: int = 3,
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.compressor = zstandard.ZstdCompressor(level=level)
+        self.decompressor = zstandard.ZstdDecompressor()
+        self.hits = 0
+        self.misses = 0
+        # Каждый процесс должен открывать своё подключение к базе.
+        self.connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None
+        )
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+            self.connection.execute('COMMIT')
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+
+    def get(self, url: str, max_age: float | None = None) -> Snapshot | None:
+        """Return snapshot of the url or None if it is missing or too old."""
+        row = self.connection.execute(
+            'SELECT pages.current_url, pages.title, pages.content_hash, '
+            'pages.created, blobs.data FROM pages JOIN blobs '
+            'USING (content_hash) WHERE pages.url = ?',
+            (url,),
+        ).fetchone()
+        if row is None or (
+            max_age is not None and time.time() - row[3] > max_age
+        ):
+            self.misses += 1
+            return None
+        self.hits += 1
+        current_url, title, content_hash, created, data = row
+        self.connection.execute(
+            'UPDATE pages SET last_access = ? WHERE url = ?',
+            (time.time(), url),
+        )
+        return Snapshot(
+            url=url,
+            current_url=current_url,
+            title=title,
+            html=self.decompressor.decompress(data).decode(),
+            content_hash=content_hash,
+            created=created,
+        )
+
+    def put(
+        self, url: str, current_url: str, title: str, html: str
+    ) -> Snapshot:
+        encoded = html.encode()
+        content_hash = hashlib.sha256(encoded).hexdigest()
+        now = time.time()
+        with self._transaction():
+            known = self.connection.execute(
+                'SELECT 1 FROM blobs WHERE content_hash = ?', (content_hash,)
+            ).fetchone()
+            if known is None:
+                data = self.compressor.compress(encoded)
+                self.connection.execute(
+                    'INSERT INTO blobs (content_hash, data, size) '
+                    'VALUES (?, ?, ?)',
+                    (content_hash, data, len(data)),
+                )
+                self._add_size(len(data))
+            previous = self.connection.execute(
+                'SELECT content_hash FROM pages WHERE url = ?', (url,)
+            ).fetchone()
+            self.connection.execute(
+                'INSERT OR REPLACE INTO pages (url, current_url, title, '
+                'content_hash, created, last_access) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (url, current_url, title, content_hash, now, now),
+            )
+            # Прошлое содержимое страницы могло остаться без ссылок.
+            if previous is not None and previous[0] != content_hash:
+                self._delete_orphans([previous[0]])
+            if self.get_size() > self.max_bytes:
+                self._evict(keep=url)
+        return Snapshot(
+            url=url,
+            current_url=current_url,
+            title=title,
+            html=html,
+            content_hash=content_hash,
+            created=now,
+        )
+
+    def save(self, driver: WebDriver, url: str | None = None) -> Snapshot:
+        """Store the page opened in the browser (under `url` if passed)."""
+        current_url, title, html = driver.execute_script(SNAPSHOT_JS)
+        return self.put(url or current_url, current_url, title, html)
+
+    def get_or_fetch(
+        self, driver: WebDriver, url: str, max_age: float | None = None
+    ) -> Snapshot:
+        """Return cached snapshot, open the url in the browser on a miss."""
+        snapshot = self.get(url, max_age)
+        if snapshot is None:
+            driver.get(url)
+            snapshot = self.save(driver, url)
+        return snapshot
+
+    def _add_size(self, size: int) -> None:
+        self.connection.execute(
+            "UPDATE totals SET value = value + ? WHERE name = 'bytes'", (size,)
+        )
+
+    def _delete_orphans(self, hashes: list[str]) -> None:
+        """Delete blobs of `hashes` which no page refers to."""
+        for content_hash in set(hashes):
+            used = self.connection.execute(
+                'SELECT 1 FROM pages WHERE content_hash = ? LIMIT 1',
+                (content_hash,),
+            ).fetchone()
+            if used is not None:
+                continue
+            deleted = self.connection.execute(
+                'DELETE FROM blobs WHERE content_hash = ? RETURNING size',
+                (content_hash,),
+            ).fetchone()
+            if deleted is not None:
+                self._add_size(-deleted[0])
+
+    def get_size(self) -> int:
+        """Return size of the compressed pages in bytes."""
+        return self.connection.execute(
+            "SELECT value FROM totals WHERE name = 'bytes'"
+        ).fetchone()[0]
+
+    def _evict(self, keep: str | None = None) -> int:
+        # Удаляем по одной самой старой странице, пока размер не влезет,
+        # страницу `keep` (только что записанную) не трогаем.
+        evicted = 0
+        while self.get_size() > self.max_bytes:
+            row = self.connection.execute(
+                'DELETE FROM pages WHERE url = (SELECT url FROM pages '
+                'WHERE url IS NOT ? ORDER BY last_access LIMIT 1) '
+                'RETURNING content_hash',
+                (keep,),
+            ).fetchone()
+            if row is None:
+                break
+            self._delete_orphans([row[0]])
+            evicted += 1
+        return evicted
+
+    def evict(self) -> int:
+        """Delete least recently read pages over `max_bytes`, return count."""
+        with self._transaction():
+            return self._evict()
+
+    def clear(self) -> None:
+        with self._transaction():
+            self.connection.execute('DELETE FROM pages')
+            self.connection.execute('DELETE FROM blobs')
+            self.connection.execute(
+                "UPDATE totals SET value = 0 WHERE name = 'bytes'"
+            )
+        self.connection.execute('VACUUM')
+
+    def stats(self) -> dict[str, float]:
+        """Return hits and misses of this instance and size of the cache."""
+        requests = self.hits + self.misses
+        pages = self.connection.execute(
+            'SELECT COUNT(*) FROM pages'
+        ).fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / requests if requests else 0,
+            'miss_ratio': self.misses / requests if requests else 0,
+            'pages': pages,
+            'bytes': self.get_size(),
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Page snapshot cache.')
+    parser.add_argument('path', type=Path)
+    parser.add_argument('--clear', action='store_true')
+    args = parser.parse_args()
+
+    cache = SnapshotCache(str(args.path))
+    if args.clear:
+        cache.clear()
+    print(json.dumps(cache.stats(), indent=4))
+    cache.close()
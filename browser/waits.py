@@ -0,0 +1,303 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import Literal
+from typing import TypeVar
+
+from selenium.common.exceptions import JavascriptException
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support.wait import WebDriverWait
+
+from browser.locators import FIND_ELEMENT_JS
+from browser.locators import Locator
+
+
+T = TypeVar('T')
+ElementState = Literal['present', 'visible', 'clickable']
+
+
+# Ставится в страницу один раз: MutationObserver отмечает время последнего
+# изменения DOM, обертки fetch/XMLHttpRequest считают незавершенные запросы.
+READINESS_PROBE_JS = '''
+if (!window.__readiness) {
+    var state = {pending: 0, mutations: 0, lastChange: performance.now()};
+    window.__readiness = state;
+    var touch = function () {
+        state.lastChange = performance.now();
+    };
+    new MutationObserver(function (records) {
+        state.mutations += records.length;
+        touch();
+    }).observe(document, {
+        subtree: true, childList: true, attributes: true, characterData: true
+    });
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            state.pending++;
+            touch();
+            return originalFetch.apply(this, arguments).finally(function () {
+                state.pending--;
+                touch();
+            });
+        };
+    }
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        state.pending++;
+        touch();
+        this.addEventListener('loadend', function () {
+            state.pending--;
+            touch();
+        }, {once: true});
+        return originalSend.apply(this, arguments);
+    };
+}
+'''
+
+# Ждет пока DOM не меняется `quiet` мс и нет запросов, но не дольше `timeout`.
+WAIT_QUIET_JS = '''
+var quiet = arguments[0];
+var timeout = arguments[1];
+var done = arguments[arguments.length - 1];
+var state = window.__readiness;
+var start = performance.now();
+var check = function () {
+    var now = performance.now();
+    if (state.pending === 0 && now - state.lastChange >= quiet) {
+        done(true);
+    } else if (now - start >= timeout) {
+        done(false);
+    } else {
+        setTimeout(check, Math.min(quiet, 25));
+    }
+};
+check();
+'''
+
+# Проверяет сразу несколько локаторов за один вызов execute_script.
+# Возвращает найденные элементы или null если хотя бы один не готов.
+ALL_LOCATED_JS = (
+    FIND_ELEMENT_JS
+    + '''
+var specs = arguments[0];
+var isVisible = function (element) {
+    var style = window.getComputedStyle(element);
+    return element.getClientRects().length > 0
+        && style.visibility !== 'hidden'
+        && style.display !== 'none';
+};
+var elements = [];
+for (var i = 0; i < specs.length; i++) {
+    var state = specs[i][0], by = specs[i][1], value = specs[i][2];
+    var element = find(by, value);
+    if (element === null) {
+        return null;
+    }
+    if (state !== 'present' && !isVisible(element)) {
+        return null;
+    }
+    if (state === 'clickable' && element.disabled) {
+        return null;
+    }
+    elements.push(element);
+}
+return elements;
+'''
+)
+
+# Границы корзин гистограммы времени ожидания (секунды).
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def install_readiness_probe(driver: WebDriver) -> None:
+    """Start watching DOM changes and requests of the current page."""
+    driver.execute_script(READINESS_PROBE_JS)
+
+
+def wait_until_quiet(
+    driver: WebDriver,
+    quiet: float = 0.3,
+    timeout: float = 10,
+) -> bool:
+    """Wait until DOM is quiet for `quiet` seconds and no requests pending.
+
+    Returns False if the page didn't calm down in `timeout` seconds.
+    The wait is cut to 80% of the session script timeout
+    (RunPreset.script_timeout) so the driver doesn't abort the script.
+    """
+    # Скрипт должен закончиться сам раньше чем его прервет драйвер.
+    timeout = min(timeout, driver.timeouts.script * 0.8)
+    for _ in range(2):
+        # Если прошлую страницу заменила новая, проба ставится заново.
+        install_readiness_probe(driver)
+        try:
+            return driver.execute_async_script(
+                WAIT_QUIET_JS, quiet * 1000, timeout * 1000
+            )
+        except TimeoutException:
+            # Скрипт прерван по таймауту драйвера ("script timeout").
+            return False
+        except JavascriptException:
+            # Страница перезагрузилась во время ожидания - ждем новую.
+            continue
+    return False
+
+
+@contextmanager
+def settled(
+    driver: WebDriver,
+    quiet: float = 0.3,
+    timeout: float = 10,
+) -> Iterator[None]:
+    """Wait until the page calms down after actions of the `with` block.
+
+    The probe is installed before the block, so requests started by the
+    actions (e.g. click) are also awaited.
+    """
+    install_readiness_probe(driver)
+    yield
+    wait_until_quiet(driver, quiet, timeout)
+
+
+def present(locator: Locator) -> tuple[ElementState, str, str]:
+    """Spec for all_located: element is in DOM."""
+    return ('present', *locator)
+
+
+def visible(locator: Locator) -> tuple[ElementState, str, str]:
+    """Spec for all_located: element is displayed."""
+    return ('visible', *locator)
+
+
+def clickable(locator: Locator) -> tuple[ElementState, str, str]:
+    """Spec for all_located: element is displayed and enabled."""
+    return ('clickable', *locator)
+
+
+def all_located(
+    *specs: tuple[ElementState, str, str],
+) -> Callable[[WebDriver], list[WebElement] | Literal[False]]:
+    """Condition: all locators are in their states, checked in one script.
+
+    Only 'xpath' and 'css selector' locators are supported.
+    """
+    for _, by, _ in specs:
+        if by not in ('xpath', 'css selector'):
+            raise ValueError(f'Locator {by=} is not supported.')
+
+    def all_located(driver: WebDriver) -> list[WebElement] | Literal[False]:
+        elements = driver.execute_script(ALL_LOCATED_JS, [*map(list, specs)])
+        return elements or False
+
+    return all_located
+
+
+def get_condition_name(method: Callable[..., Any]) -> str:
+    """Return name of the condition (EC.* return inner `_predicate`)."""
+    name = getattr(method, '__qualname__', type(method).__qualname__)
+    return name.split('.<locals>')[0]
+
+
+class LatencyHistogram:
+    """Count of waits by duration buckets (like prometheus histogram)."""
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.timeouts = 0
+
+    def observe(self, seconds: float, timeout: bool = False) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        self.timeouts += timeout
+
+    def to_dict(self) -> dict[str, Any]:
+        labels = [f'le_{bucket}' for bucket in self.buckets] + ['le_inf']
+        return {
+            'count': self.count,
+            'total': self.total,
+            'timeouts': self.timeouts,
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class AdaptiveWait(WebDriverWait[WebDriver]):
+    """WebDriverWait which polls often at first and then less often.
+
+    The first check is repeated after `initial_poll` seconds, each next pause
+    is `factor` times longer but not longer than `max_poll`. Waiting time of
+    each condition type is collected in `histograms`.
+    """
+
+    def __init__(
+        self,
+        driver: WebDriver,
+        timeout: float,
+        initial_poll: float = 0.005,
+        max_poll: float = 0.5,
+        factor: float = 2,
+        ignored_exceptions: Iterable[type[Exception]] | None = None,
+    ) -> None:
+        super().__init__(driver, timeout, max_poll, ignored_exceptions)
+        self.initial_poll = initial_poll
+        self.max_poll = max_poll
+        self.factor = factor
+        self.histograms: dict[str, LatencyHistogram] = dict()
+        self._lock = threading.Lock()
+
+    def _observe(self, name: str, seconds: float, timeout: bool) -> None:
+        with self._lock:
+            histogram = self.histograms.setdefault(name, LatencyHistogram())
+            histogram.observe(seconds, timeout)
+
+    def until(
+        self,
+        method: Callable[[WebDriver], Literal[False] | T],
+        message: str = '',
+    ) -> T:
+        screen = None
+        stacktrace = None
+        name = get_condition_name(method)
+        start = time.monotonic()
+        end_time = start + self._timeout
+        poll = self.initial_poll
+        while True:
+            try:
+                value = method(self._driver)
+                if value:
+                    self._observe(name, time.monotonic() - start, False)
+                    return value
+            except self._ignored_exceptions as exc:
+                screen = getattr(exc, 'screen', None)
+                stacktrace = getattr(exc, 'stacktrace', None)
+            now = time.monotonic()
+            if now > end_time:
+                break
+            time.sleep(min(poll, end_time - now))
+            poll = min(poll * self.factor, self.max_poll)
+        self._observe(name, time.monotonic() - start, True)
+        raise TimeoutException(message, screen, stacktrace)
+
+    def until_all(
+        self,
+        *specs: tuple[ElementState, str, str],
+        message: str = '',
+    ) -> list[WebElement]:
+        """Wait all locators in their states, see `all_located`."""
+        return self.until(all_located(*specs), message)
+
+    def report(self) -> dict[str, dict[str, Any]]:
+        """Return histograms of waiting time by condition."""
+        with self._lock:
+            return {n: h.to_dict() for n, h in self.histograms.items()}
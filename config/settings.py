@@ -1,5 +1,8 @@
 import os
 from pathlib import Path
+from typing import Literal
+
+from pydantic import BaseModel
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -11,3 +14,82 @@ def set_new_folder_or_get_existent(suffix: str) -> str:
     if not os.path.isdir(path):
         os.mkdir(path)
     return path
+
+
+class RunPreset(BaseModel):
+    """Browser settings which affect the speed of a run."""
+
+    name: str
+    headless: bool
+    devtools: bool
+    page_load_strategy: Literal['normal', 'eager', 'none']
+    width: int = 1920
+    height: int = 1080
+    disk_cache: bool = True
+    # Не загружать картинки, шрифты и счетчики (browser/lean.py).
+    lean: bool = False
+    page_load_timeout: float
+    script_timeout: float
+    # Время ожидания элементов (WebDriverWait, AdaptiveWait).
+    wait_timeout: float
+
+
+presets = {
+    # Запуск руками: окно браузера, панель разработки, полная загрузка.
+    'interactive': RunPreset(
+        name='interactive',
+        headless=False,
+        devtools=True,
+        page_load_strategy='normal',
+        page_load_timeout=300,
+        script_timeout=30,
+        wait_timeout=10,
+    ),
+    # Тесты и задачи без человека: без окна, ждем только DOM.
+    'ci-fast': RunPreset(
+        name='ci-fast',
+        headless=True,
+        devtools=False,
+        page_load_strategy='eager',
+        disk_cache=False,
+        page_load_timeout=30,
+        script_timeout=15,
+        wait_timeout=5,
+    ),
+    # Сбор данных: еще и без картинок, шрифтов и счетчиков.
+    'scrape-max': RunPreset(
+        name='scrape-max',
+        headless=True,
+        devtools=False,
+        page_load_strategy='eager',
+        width=1280,
+        height=800,
+        lean=True,
+        page_load_timeout=20,
+        script_timeout=10,
+        wait_timeout=3,
+    ),
+}
+
+
+def apply_env_overrides(preset: RunPreset) -> RunPreset:
+    """Return copy of the preset with fields from RUN_<FIELD> variables.
+
+    E.g. RUN_HEADLESS=0 RUN_WAIT_TIMEOUT=20.
+    """
+    values = preset.model_dump()
+    for field in RunPreset.model_fields:
+        value = os.getenv(f'RUN_{field.upper()}')
+        if value is not None and field != 'name':
+            values[field] = value
+    return RunPreset.model_validate(values)
+
+
+def get_run_preset(default: str = 'interactive') -> RunPreset:
+    """Return preset RUN_PRESET (or `default`) with RUN_<FIELD> overrides."""
+    name = os.getenv('RUN_PRESET', default)
+    if name not in presets:
+        raise ValueError(
+            f'Unknown run preset {name!r}, choose one of {list(presets)}.'
+        )
+    return apply_env_overrides(presets[name])
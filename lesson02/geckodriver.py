@@ -1,9 +1,7 @@
-from selenium import webdriver
 from selenium.webdriver.firefox.options import Options
-from selenium.webdriver.firefox.service import Service
-from webdriver_manager.firefox import GeckoDriverManager
 
-from config.settings import set_new_folder_or_get_existent
+from browser.factory import lazy_firefox
+from config.settings import get_run_preset
 
 
 # Что-бы видеть курсор (https://stackoverflow.com/a/76068212/20084479)
@@ -24,21 +22,35 @@ document.addEventListener('mousemove', function(e) {
 });
 '''
 
-# Настройка браузера перед запуском.
+# Настройка браузера перед запуском. Что включать берется из пресета запуска
+# (RUN_PRESET=interactive|ci-fast|scrape-max, см. config/settings.py).
+preset = get_run_preset()
 options = Options()
 
 # --devtools -> Open DevTools on initial load (запуск с панелью разработки).
-options.add_argument('--devtools')
+if preset.devtools:
+    options.add_argument('--devtools')
+
+# --headless -> Run without GUI (запуск браузера без графического интерфейса).
+if preset.headless:
+    options.add_argument('--headless')
+
+# 'eager' - ждем только загрузку DOM, а не всех картинок, стилей, ...
+options.page_load_strategy = preset.page_load_strategy
 
 # --width=<int> --height=<int> указать какого размера должно быть окно
 # браузера при его запуске (данный способ предпочтительнее).
-options.add_argument('--width=1920')
-options.add_argument('--height=1080')
+options.add_argument(f'--width={preset.width}')
+options.add_argument(f'--height={preset.height}')
 
 # Загрузка профиля firefox или создание нового. Профиль нужен для хранения
 # настроек, закладок, паролей, ... (профиль необходим даже в режиме private!)
-options.add_argument('--profile')
-options.add_argument(set_new_folder_or_get_existent('firefox_profile'))
-
-service = Service(executable_path=GeckoDriverManager().install())
-driver = webdriver.Firefox(options=options, service=service)
+# Каждый запуск получает свою копию шаблона `firefox_profile` в tmpfs, так
+# параллельные запуски не мешают друг другу (browser/profiles.py). Копия
+# делается при запуске браузера, поэтому импорт модуля остается быстрым.
+profile = 'firefox_profile'
+
+# Браузер запускается только при первом обращении к `driver` (например
+# driver.get(...)), а не при импорте модуля, и закрывается при выходе из
+# Python.
+driver = lazy_firefox(options, preset, profile)
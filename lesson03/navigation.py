@@ -1,20 +1,19 @@
-from time import sleep
-
+from browser.waits import wait_until_quiet
 from lesson02.geckodriver import driver
 
 
 # Делаем основной запрос.
 driver.get('https://www.google.com')
-sleep(2)
+wait_until_quiet(driver)
 # Имитируем ввод `hello world` в строке поиска.
 driver.get('https://www.google.com/search?q=hello+world')
-sleep(2)
+wait_until_quiet(driver)
 # Имитируем нажатие на кнопку `назад` [ <- ].
 driver.back()
-sleep(2)
+wait_until_quiet(driver)
 # Имитируем нажатие на кнопку `вперед` [ -> ].
 driver.forward()
-sleep(2)
+wait_until_quiet(driver)
 # Имитируем нажатие на кнопку `обновить страницу`.
 driver.refresh()
-sleep(2)
+wait_until_quiet(driver)
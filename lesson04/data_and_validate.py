@@ -1,4 +1,9 @@
+from pathlib import Path
+
+from browser.snapshots import SnapshotCache
+from config.settings import set_new_folder_or_get_existent
 from lesson02.geckodriver import driver
+from lesson06.utils.static_finders import extract_records_static
 
 
 driver.get('https://www.wikipedia.org/')
@@ -8,3 +13,21 @@ url = driver.current_url
 title = driver.title
 # Получение исходного HTML кода полученной страницы типа `str` .
 html = driver.page_source
+
+# Страница отрисована на сервере, поэтому искать данные в `html` можно без
+# браузера, за один проход lxml (быстрее чем find_element на каждое поле).
+languages = extract_records_static(
+    html=html,
+    xpath='//div[contains(@class, "central-featured-lang")]',
+    fields={'language': './/strong', 'articles': './/small/bdi'},
+)
+
+# Снимок страницы (HTML сжатый zstd, url и заголовок) сохраняется в кэш.
+# Экстракторы могут потом читать его без браузера: cache.get(url).html
+# (browser/snapshots.py), что удобно при отладке экстракторов.
+cache = SnapshotCache(
+    str(Path(set_new_folder_or_get_existent('snapshots')) / 'pages.db')
+)
+cache.put(url, url, title, html)
+print(cache.stats())
+cache.close()
@@ -1,3 +1,5 @@
+from browser.batch import BatchActions
+from browser.live import LiveElements
 from lesson02.geckodriver import driver
 
 
@@ -61,3 +63,32 @@ for index, delete_button in enumerate(delete_button_remained):
 by_value = ('xpath', '//button[@class="added-manually"]')
 delete_button_total = driver.find_elements(*by_value)
 assert len(delete_button_total) == 0
+
+# Что-бы не искать элементы заново после каждого изменения ДОМа руками, можно
+# использовать "живую" коллекцию. Она спрашивает у страницы счетчик изменений
+# ДОМа и ищет элементы заново только если ДОМ изменился, а количество
+# элементов считает прямо в странице не передавая сами элементы.
+delete_buttons = LiveElements(driver, by_value)
+for _ in range(10):
+    add_element_button.click()
+assert len(delete_buttons) == 10
+# Удаляем 4 кнопки, каждый раз берется актуальная первая кнопка.
+for _ in range(4):
+    delete_buttons[0].click()
+assert len(delete_buttons) == 6
+# Если элемент все же устарел, он один раз ищется заново без исключения.
+print(f'Поисков элементов: {delete_buttons.searches}')
+
+# Каждый `click()` это отдельная команда драйверу. Пачку шагов можно отправить
+# за один раз: в режиме 'script' одним скриптом с результатом каждого шага, в
+# режиме 'actions' одной командой W3C Actions (настоящие события мыши).
+batch = BatchActions(driver)
+for _ in range(10):
+    batch.click(add_element_button)
+# Локатор ищется при выполнении шага, так что каждый раз удаляется актуальная
+# первая кнопка.
+for _ in range(4):
+    batch.click(by_value)
+results = batch.run()
+assert all(result.ok for result in results), results
+assert len(delete_buttons) == 6 + 10 - 4
@@ -0,0 +1,369 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any
+from typing import Callable
+
+from pydantic import TypeAdapter
+from selenium.common.exceptions import WebDriverException
+
+from browser.bidi import Tab
+from browser.bidi import open_bidi
+from browser.factory import create_firefox
+from browser.factory import get_firefox_options
+from browser.factory import lazy_firefox
+from browser.snapshots import SnapshotCache
+from config.settings import get_run_preset
+from config.settings import set_new_folder_or_get_existent
+from lesson06.interact_with_group_html_elements import card_fields
+from lesson06.interact_with_group_html_elements import get_book_from_record
+from lesson06.interact_with_group_html_elements import get_books
+from lesson06.interact_with_group_html_elements import get_books_from_html
+from lesson06.interact_with_group_html_elements import xpath
+from lesson06.utils.html_finders import EXTRACT_RECORDS_JS
+from lesson06.utils.models.book import Book
+from lesson06.utils.static_finders import fetch_html
+from lesson06.utils.work_queue import WorkQueue
+
+
+CATALOGUE_URL = 'http://books.toscrape.com/catalogue/page-{page}.html'
+CATALOGUE_PAGES = 50
+books_adapter = TypeAdapter(list[Book])
+
+
+def get_page_urls(catalogues: list[str], pages: int) -> list[str]:
+    """Return urls of all pages of all catalogues."""
+    return [
+        catalogue.format(page=page)
+        for catalogue in catalogues
+        for page in range(1, pages + 1)
+    ]
+
+
+def get_error(exception: BaseException) -> str:
+    return str(exception) or type(exception).__name__
+
+
+def work_static(db_path: str, timeout: float) -> None:
+    """Same as work, but pages are fetched and parsed without the browser."""
+    queue = WorkQueue(db_path, lease=timeout * 2)
+    try:
+        while True:
+            url = queue.claim()
+            if url is None:
+                if queue.is_finished():
+                    break
+                time.sleep(1)
+                continue
+            try:
+                books = get_books_from_html(fetch_html(url, timeout))
+            except Exception as exception:
+                # Ошибка одной страницы не должна останавливать процесс.
+                queue.fail(url, get_error(exception))
+                continue
+            queue.complete(url, books_adapter.dump_json(books).decode())
+    finally:
+        queue.close()
+
+
+def work(db_path: str, timeout: float) -> None:
+    """Take pages from the queue and scrape them until the queue is empty."""
+    queue = WorkQueue(db_path, lease=timeout * 2)
+    # Картинки, шрифты и счетчики не нужны для сбора данных: пресет
+    # scrape-max включает lean (RUN_LEAN=0 выключает).
+    preset = get_run_preset(default='scrape-max')
+    options = get_firefox_options(preset=preset)
+    driver = create_firefox(options, preset)
+    driver.set_page_load_timeout(timeout)
+    try:
+        while True:
+            url = queue.claim()
+            if url is None:
+                if queue.is_finished():
+                    break
+                # Остальные страницы в работе у других процессов, ждём
+                # пока они закончат или их аренда истечет.
+                time.sleep(1)
+                continue
+            try:
+                driver.get(url)
+                books = get_books(driver)
+            except WebDriverException as exception:
+                queue.fail(url, str(exception))
+                # После ошибки браузер может быть в любом состоянии.
+                driver.quit()
+                driver = create_firefox(options, preset)
+                driver.set_page_load_timeout(timeout)
+                continue
+            except Exception as exception:
+                # Ошибка разбора страницы, браузер в порядке.
+                queue.fail(url, get_error(exception))
+                continue
+            queue.complete(url, books_adapter.dump_json(books).decode())
+    finally:
+        driver.quit()
+        queue.close()
+
+
+def work_cached(
+    db_path: str, timeout: float, cache_path: str, stats: Any
+) -> None:
+    """Same as work, but books are extracted from cached page snapshots.
+
+    The browser is started only when a page is missing in the cache, so
+    extractors can be re-run over cached pages without a recrawl. Cache
+    hits and misses of the process are put to `stats` (SimpleQueue).
+    """
+    queue = WorkQueue(db_path, lease=timeout * 2)
+    cache = SnapshotCache(cache_path)
+    preset = get_run_preset(default='scrape-max')
+    options = get_firefox_options(preset=preset)
+    driver = lazy_firefox(options, preset)
+    try:
+        while True:
+            url = queue.claim()
+            if url is None:
+                if queue.is_finished():
+                    break
+                time.sleep(1)
+                continue
+            try:
+                snapshot = cache.get(url)
+                if snapshot is None:
+                    driver.set_page_load_timeout(timeout)
+                    driver.get(url)
+                    snapshot = cache.save(driver, url)
+                books = get_books_from_html(snapshot.html)
+            except Exception as exception:
+                queue.fail(url, get_error(exception))
+                if isinstance(exception, WebDriverException):
+                    # Ленивый драйвер запустит новый браузер при промахе.
+                    driver.quit()
+                continue
+            queue.complete(url, books_adapter.dump_json(books).decode())
+    finally:
+        stats.put((cache.hits, cache.misses))
+        driver.quit()
+        cache.close()
+        queue.close()
+
+
+async def extract_records_bidi(
+    tab: Tab, xpath: str, fields: dict[str, str], timeout: float = 10
+) -> list[dict[str, str | None]]:
+    """Same as extract_records, for a tab driven over WebDriver BiDi."""
+    return await asyncio.wait_for(
+        tab.call_function(EXTRACT_RECORDS_JS, None, xpath, fields), timeout
+    )
+
+
+async def scrape_tab(
+    tab: Tab, queue: WorkQueue, timeout: float, executor: ThreadPoolExecutor
+) -> None:
+    """Scrape pages from the queue in the tab until the queue is empty.
+
+    Queue calls run in `executor` (the thread which opened the queue), so
+    the blocking sqlite doesn't stop other tabs.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        url = await loop.run_in_executor(executor, queue.claim)
+        if url is None:
+            if await loop.run_in_executor(executor, queue.is_finished):
+                break
+            await asyncio.sleep(1)
+            continue
+        try:
+            await asyncio.wait_for(tab.navigate(url), timeout)
+            records = await extract_records_bidi(
+                tab, xpath['card'], card_fields, timeout
+            )
+            books = [get_book_from_record(record) for record in records]
+        except Exception as exception:
+            error = get_error(exception)
+            await loop.run_in_executor(executor, queue.fail, url, error)
+            continue
+        result = books_adapter.dump_json(books).decode()
+        await loop.run_in_executor(executor, queue.complete, url, result)
+
+
+async def work_bidi_async(db_path: str, timeout: float, tabs: int) -> None:
+    # Соединение sqlite работает только в создавшем его потоке, поэтому
+    # очередь открывается и используется в одном отдельном потоке.
+    executor = ThreadPoolExecutor(max_workers=1)
+    loop = asyncio.get_running_loop()
+    queue = await loop.run_in_executor(
+        executor, partial(WorkQueue, db_path, lease=timeout * 2)
+    )
+    preset = get_run_preset(default='scrape-max')
+    options = get_firefox_options(bidi=True, preset=preset)
+    try:
+        driver = create_firefox(options, preset)
+        try:
+            async with open_bidi(driver) as bidi:
+                pages = [await bidi.new_tab() for _ in range(tabs)]
+                await asyncio.gather(
+                    *(
+                        scrape_tab(page, queue, timeout, executor)
+                        for page in pages
+                    )
+                )
+        finally:
+            driver.quit()
+    finally:
+        await loop.run_in_executor(executor, queue.close)
+        executor.shutdown()
+
+
+def work_bidi(db_path: str, timeout: float, tabs: int) -> None:
+    """Same as work, but one browser scrapes pages in `tabs` tabs at once.
+
+    Tabs are driven over one WebDriver BiDi websocket from one event loop.
+    """
+    asyncio.run(work_bidi_async(db_path, timeout, tabs))
+
+
+def crawl(
+    db_path: str,
+    urls: list[str],
+    workers: int,
+    timeout: float,
+    static: bool = False,
+    tabs: int = 0,
+    cache: str | None = None,
+    retry_failed: bool = False,
+) -> list[Book]:
+    """Scrape all urls with `workers` processes and return all books.
+
+    Pages already finished in `db_path` by previous runs are not scraped again.
+    Server-rendered pages can be fetched without browsers with `static`.
+    With `tabs` each browser scrapes that many pages at once over BiDi.
+    With `cache` pages are read from (and saved to) the snapshot cache.
+    With `retry_failed` pages failed in previous runs are scraped again.
+    """
+    queue = WorkQueue(db_path)
+    queue.put_many(urls)
+    if retry_failed:
+        print(f'Retrying {queue.retry_failed()} failed pages.')
+
+    # spawn - что-бы процессы не наследовали состояние selenium родителя.
+    context = multiprocessing.get_context('spawn')
+    # Процессы присылают сюда попадания и промахи своего кэша.
+    stats = context.SimpleQueue()
+    target: Callable[..., None] = work
+    args: tuple[Any, ...] = (db_path, timeout)
+    if static:
+        target = work_static
+    elif tabs:
+        target, args = work_bidi, (db_path, timeout, tabs)
+    elif cache is not None:
+        target, args = work_cached, (db_path, timeout, cache, stats)
+    processes = [
+        context.Process(target=target, args=args) for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    restarts = 0
+    try:
+        while not queue.is_finished():
+            for index, process in enumerate(processes):
+                if process.is_alive() or process.exitcode == 0:
+                    continue
+                restarts += 1
+                if restarts > workers * 3:
+                    raise RuntimeError('Worker processes keep crashing.')
+                # Процесс упал, его страница вернется в очередь по аренде.
+                processes[index] = context.Process(target=target, args=args)
+                processes[index].start()
+            time.sleep(1)
+    except BaseException:
+        # Остальные процессы не должны работать после ошибки.
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        raise
+    finally:
+        for process in processes:
+            process.join()
+
+    books: list[Book] = list()
+    for _, result in queue.results():
+        books.extend(books_adapter.validate_json(result))
+    print(queue.counts())
+    queue.close()
+    if cache is not None:
+        # Итог по всем процессам, размер и число страниц - из самого кэша.
+        snapshots = SnapshotCache(cache)
+        while not stats.empty():
+            hits, misses = stats.get()
+            snapshots.hits += hits
+            snapshots.misses += misses
+        print(snapshots.stats())
+        snapshots.close()
+    return books
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Scrape books.toscrape.com catalogues in parallel.'
+    )
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        '--catalogue',
+        action='append',
+        help=f'Url template of catalogue pages, default: {CATALOGUE_URL}',
+    )
+    parser.add_argument('--pages', type=int, default=CATALOGUE_PAGES)
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument(
+        '--db',
+        default=str(
+            Path(set_new_folder_or_get_existent('crawler')) / 'books.db'
+        ),
+    )
+    parser.add_argument('--output', default=None)
+    parser.add_argument(
+        '--static',
+        action='store_true',
+        help='Pages are server-rendered: fetch them without the browser.',
+    )
+    parser.add_argument(
+        '--tabs',
+        type=int,
+        default=0,
+        help='Scrape this many pages at once in each browser over BiDi.',
+    )
+    parser.add_argument(
+        '--cache',
+        default=None,
+        help='Snapshot cache database: extract books from cached pages.',
+    )
+    parser.add_argument(
+        '--retry-failed',
+        action='store_true',
+        help='Scrape again pages which failed all attempts in previous runs.',
+    )
+    args = parser.parse_args()
+
+    urls = get_page_urls(args.catalogue or [CATALOGUE_URL], args.pages)
+    books = crawl(
+        args.db,
+        urls,
+        args.workers,
+        args.timeout,
+        args.static,
+        args.tabs,
+        args.cache,
+        args.retry_failed,
+    )
+    print(f'Scraped {len(books)} books.')
+    if args.output is not None:
+        dumped = books_adapter.dump_python(books, mode='json')
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(dumped, file, ensure_ascii=False, indent=4)
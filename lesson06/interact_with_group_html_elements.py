@@ -1,13 +1,17 @@
 from pprint import pprint
 
 from pydantic import TypeAdapter
+from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 
 from lesson02.geckodriver import driver
+from lesson06.utils.html_finders import extract_records
 from lesson06.utils.html_finders import find_element
 from lesson06.utils.html_finders import find_elements
 from lesson06.utils.models.book import Book
+from lesson06.utils.models.book_table import BookTable
 from lesson06.utils.models.price import Price
+from lesson06.utils.static_finders import extract_records_static
 
 
 xpath = {
@@ -16,6 +20,12 @@ xpath = {
     'book_price': './/div[@class="product_price"]/p[@class="price_color"]',
     'book_title': './/h3/a',
 }
+# Поля карточки для extract_records (`/@title` - чтение атрибута `title`).
+card_fields = {
+    'book_in_stock': xpath['book_in_stock'],
+    'book_price': xpath['book_price'],
+    'book_title': xpath['book_title'] + '/@title',
+}
 
 
 def get_book_in_stock(card: WebElement) -> bool:
@@ -41,9 +51,22 @@ def get_book_title(card: WebElement) -> str:
     raise ValueError(f'Attribute \'title\' not found in {xpath["book_title"]}')
 
 
-def main() -> list[Book]:
-    driver.get('http://books.toscrape.com/index.html')
-    book_cards = find_elements(root=driver, xpath=xpath['card'])
+def get_book_from_record(record: dict[str, str | None]) -> Book:
+    """Return book built from the record of extract_records."""
+    title = record['book_title']
+    if title is None:
+        msg = f'Attribute \'title\' not found in {xpath["book_title"]}'
+        raise ValueError(msg)
+    return Book(
+        in_stock=record['book_in_stock'] in ('In stock',),
+        price=Price(price=record['book_price'] or ''),
+        title=title,
+    )
+
+
+def get_books_by_elements(root: WebDriver | WebElement) -> list[Book]:
+    """Return books from all cards, each field is a separate request."""
+    book_cards = find_elements(root=root, xpath=xpath['card'])
     return [
         Book(
             in_stock=get_book_in_stock(card),
@@ -54,6 +77,39 @@ def main() -> list[Book]:
     ]
 
 
+def get_books(root: WebDriver | WebElement) -> list[Book]:
+    """Return books from all cards found inside root in one request."""
+    records = extract_records(
+        root=root, xpath=xpath['card'], fields=card_fields
+    )
+    return [get_book_from_record(record) for record in records]
+
+
+def get_book_table(root: WebDriver | WebElement) -> BookTable:
+    """Return books from all cards found inside root as columns."""
+    records = extract_records(
+        root=root, xpath=xpath['card'], fields=card_fields
+    )
+    return BookTable.from_columns(
+        in_stock=[r['book_in_stock'] in ('In stock',) for r in records],
+        price=[r['book_price'] or '' for r in records],
+        title=[r['book_title'] or '' for r in records],
+    )
+
+
+def get_books_from_html(html: str) -> list[Book]:
+    """Return books from HTML of the page (without the browser)."""
+    records = extract_records_static(
+        html=html, xpath=xpath['card'], fields=card_fields
+    )
+    return [get_book_from_record(record) for record in records]
+
+
+def main() -> list[Book]:
+    driver.get('http://books.toscrape.com/index.html')
+    return get_books(driver)
+
+
 if __name__ == '__main__':
     books = main()
     pprint(TypeAdapter(list[Book]).dump_python(books))
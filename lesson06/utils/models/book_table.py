@@ -0,0 +1,198 @@
+import re
+from typing import Any
+from typing import Iterator
+from typing import Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+from lesson06.utils.models.book import Book
+from lesson06.utils.models.currency import available_currencies
+from lesson06.utils.models.currency import currency_not_found_msg
+from lesson06.utils.models.price import Price
+
+
+# Тот же формат что и в Price.price, но с группами для разбора.
+price_regex = re.compile(r'^(.)(\d+)[.,](\d{2})$')
+columns = ('in_stock', 'price', 'currency', 'title')
+
+
+def parse_price(price: str) -> tuple[str, int]:
+    """Return currency symbol and price in minor units ('£51.77' -> 5177)."""
+    match = price_regex.match(price)
+    if match is None:
+        raise ValueError(f'Invalid price {price!r}.')
+    symbol, integer_part, fractional_part = match.groups()
+    if symbol not in available_currencies:
+        raise ValueError(currency_not_found_msg.format(symbol=symbol))
+    return symbol, int(integer_part) * 100 + int(fractional_part)
+
+
+class BookTable:
+    """Many books stored as columns (one array per field).
+
+    Prices are stored as integers in minor units and currencies as indexes
+    in `symbols`, Book objects are created only when rows are accessed.
+    """
+
+    def __init__(
+        self,
+        in_stock: NDArray[np.bool_],
+        price: NDArray[np.int64],
+        currency: NDArray[np.int16],
+        title: NDArray[np.object_],
+        symbols: list[str],
+    ) -> None:
+        sizes = {len(in_stock), len(price), len(currency), len(title)}
+        if len(sizes) > 1:
+            raise ValueError(f'Columns have different length: {sizes}.')
+        self.in_stock = in_stock
+        self.price = price
+        self.currency = currency
+        self.title = title
+        self.symbols = symbols
+
+    @classmethod
+    def from_columns(
+        cls,
+        in_stock: Sequence[bool],
+        price: Sequence[str],
+        title: Sequence[str],
+    ) -> 'BookTable':
+        """Return table built from raw scraped values."""
+        symbols: list[str] = list()
+        currency = np.empty(len(price), dtype=np.int16)
+        minor = np.empty(len(price), dtype=np.int64)
+        for index, value in enumerate(price):
+            symbol, minor[index] = parse_price(value)
+            if symbol not in symbols:
+                symbols.append(symbol)
+            currency[index] = symbols.index(symbol)
+        for value in title:
+            if len(value) < 3:
+                raise ValueError(f'Title {value!r} is shorter than 3.')
+        return cls(
+            in_stock=np.array(in_stock, dtype=np.bool_),
+            price=minor,
+            currency=currency,
+            title=np.array(title, dtype=np.object_),
+            symbols=symbols,
+        )
+
+    @classmethod
+    def from_books(cls, books: Sequence[Book]) -> 'BookTable':
+        """Return table built from Book objects."""
+        return cls.from_columns(
+            in_stock=[book.in_stock for book in books],
+            price=[book.price.price for book in books],
+            title=[book.title for book in books],
+        )
+
+    @classmethod
+    def concat(cls, tables: Sequence['BookTable']) -> 'BookTable':
+        """Return one table with rows of all tables."""
+        if not tables:
+            return cls.from_columns(in_stock=[], price=[], title=[])
+        symbols: list[str] = list()
+        currencies = list()
+        for table in tables:
+            for symbol in table.symbols:
+                if symbol not in symbols:
+                    symbols.append(symbol)
+            remap = np.array(
+                [symbols.index(symbol) for symbol in table.symbols] or [0],
+                dtype=np.int16,
+            )
+            currencies.append(remap[table.currency])
+        return cls(
+            in_stock=np.concatenate([t.in_stock for t in tables]),
+            price=np.concatenate([t.price for t in tables]),
+            currency=np.concatenate(currencies),
+            title=np.concatenate([t.title for t in tables]),
+            symbols=symbols,
+        )
+
+    def __len__(self) -> int:
+        return len(self.title)
+
+    def __getitem__(self, index: int) -> Book:
+        minor = int(self.price[index])
+        symbol = self.symbols[self.currency[index]]
+        price = f'{symbol}{minor // 100}.{minor % 100:02d}'
+        return Book(
+            in_stock=bool(self.in_stock[index]),
+            price=Price(price=price),
+            title=self.title[index],
+        )
+
+    def __iter__(self) -> Iterator[Book]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def price_float(self) -> NDArray[np.float64]:
+        return self.price / 100
+
+    @property
+    def currency_codes(self) -> NDArray[np.str_]:
+        codes = [available_currencies[s].code for s in self.symbols]
+        return np.array(codes or [''])[self.currency]
+
+    def take(self, indexes: NDArray[Any]) -> 'BookTable':
+        """Return table with rows by mask or array of indexes."""
+        return BookTable(
+            in_stock=self.in_stock[indexes],
+            price=self.price[indexes],
+            currency=self.currency[indexes],
+            title=self.title[indexes],
+            symbols=self.symbols,
+        )
+
+    def filter(
+        self,
+        in_stock: bool | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        currency_code: str | None = None,
+    ) -> 'BookTable':
+        """Return rows matched to all passed conditions."""
+        mask = np.ones(len(self), dtype=np.bool_)
+        if in_stock is not None:
+            mask &= self.in_stock == in_stock
+        if min_price is not None:
+            mask &= self.price >= round(min_price * 100)
+        if max_price is not None:
+            mask &= self.price <= round(max_price * 100)
+        if currency_code is not None:
+            mask &= self.currency_codes == currency_code
+        return self.take(mask)
+
+    def sort_by(self, column: str, descending: bool = False) -> 'BookTable':
+        """Return table sorted by column (stable sort)."""
+        if column not in columns:
+            raise ValueError(f'Unknown {column=}, available: {columns}.')
+        values = getattr(self, column)
+        if not descending:
+            return self.take(np.argsort(values, kind='stable'))
+        # Сортируем перевернутый столбец, что-бы одинаковые значения
+        # сохранили исходный порядок и при сортировке по убыванию.
+        order = np.argsort(values[::-1], kind='stable')[::-1]
+        return self.take(len(values) - 1 - order)
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        """Return rows as plain dicts without creating Book objects."""
+        codes = self.currency_codes.tolist()
+        return [
+            {
+                'in_stock': in_stock,
+                'price': price / 100,
+                'currency': code,
+                'title': title,
+            }
+            for in_stock, price, code, title in zip(
+                self.in_stock.tolist(),
+                self.price.tolist(),
+                codes,
+                self.title.tolist(),
+            )
+        ]
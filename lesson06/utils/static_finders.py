@@ -0,0 +1,100 @@
+from functools import lru_cache
+from typing import Any
+from typing import Required
+from typing import TypedDict
+from typing import Unpack
+from typing import cast
+
+import requests
+from lxml import etree
+from lxml import html as lxml_html
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from lesson06.utils.html_finders import extract_records
+
+
+class StaticExtractKwargs(TypedDict):
+    html: Required[str]
+    xpath: Required[str]
+    fields: Required[dict[str, str]]
+
+
+class PageExtractKwargs(TypedDict, total=False):
+    driver: Required[WebDriver]
+    xpath: Required[str]
+    fields: Required[dict[str, str]]
+    js_fields: set[str]
+
+
+@lru_cache(maxsize=None)
+def compile_xpath(xpath: str) -> etree.XPath:
+    """Return compiled xpath, each expression is compiled only once."""
+    return etree.XPath(xpath)
+
+
+def evaluate(xpath: str, node: Any) -> list[Any]:
+    """Return nodes (or attribute values) found by the compiled xpath."""
+    return cast(list[Any], compile_xpath(xpath)(node))
+
+
+def get_node_text(node: Any) -> str:
+    """Return attribute value or whitespace-normalized text of element."""
+    if isinstance(node, str):
+        return str(node)
+    return ' '.join(node.text_content().split())
+
+
+def fetch_html(url: str, timeout: float = 30) -> str:
+    """Return HTML of server-rendered page without a browser."""
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.text
+
+
+def extract_records_static(
+    **kwargs: Unpack[StaticExtractKwargs],
+) -> list[dict[str, str | None]]:
+    """Same as extract_records, but evaluated by lxml over HTML string."""
+    document = lxml_html.fromstring(kwargs['html'])
+    records = list()
+    for root in evaluate(kwargs['xpath'], document):
+        record: dict[str, str | None] = dict()
+        for name, xpath in kwargs['fields'].items():
+            nodes = evaluate(xpath, root)
+            record[name] = get_node_text(nodes[0]) if nodes else None
+        records.append(record)
+    return records
+
+
+def extract_page_records(
+    **kwargs: Unpack[PageExtractKwargs],
+) -> list[dict[str, str | None]]:
+    """Return records of the opened page parsing its page_source by lxml.
+
+    Only fields from `js_fields` (rendered by scripts, depend on styles, ...)
+    are evaluated in the browser with extract_records.
+    """
+    driver = kwargs['driver']
+    fields = kwargs['fields']
+    js_fields = kwargs.get('js_fields', set())
+    records = extract_records_static(
+        html=driver.page_source,
+        xpath=kwargs['xpath'],
+        fields={k: v for k, v in fields.items() if k not in js_fields},
+    )
+    if not js_fields:
+        return records
+
+    js_records = extract_records(
+        root=driver,
+        xpath=kwargs['xpath'],
+        fields={k: v for k, v in fields.items() if k in js_fields},
+    )
+    if len(js_records) != len(records):
+        raise ValueError(
+            f'DOM changed during extraction: {len(records)} elements in '
+            f'page_source, {len(js_records)} elements in the browser.'
+        )
+    for record, js_record in zip(records, js_records):
+        record.update(js_record)
+    return records
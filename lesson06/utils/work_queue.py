@@ -0,0 +1,142 @@
+import sqlite3
+import time
+from typing import Iterable
+from typing import Iterator
+
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    url TEXT PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    result TEXT,
+    error TEXT
+)
+'''
+
+
+class WorkQueue:
+    """Durable queue of urls stored in SQLite.
+
+    Job taken by a worker is leased for `lease` seconds, if the worker dies or
+    hangs the lease expires and the job is returned to the queue. Finished
+    jobs keep their result, so a restarted run continues where it stopped.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        lease: float = 120,
+        max_attempts: int = 3,
+    ) -> None:
+        self.path = path
+        self.lease = lease
+        self.max_attempts = max_attempts
+        # Каждый процесс должен открывать своё подключение к базе.
+        self.connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None
+        )
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def put_many(self, urls: Iterable[str]) -> None:
+        """Add urls to the queue, already known urls are ignored."""
+        self.connection.executemany(
+            'INSERT OR IGNORE INTO jobs (url) VALUES (?)',
+            ((url,) for url in urls),
+        )
+
+    def retry_failed(self) -> int:
+        """Return failed jobs to the queue with new attempts, return count."""
+        cursor = self.connection.execute(
+            'UPDATE jobs SET status = ?, attempts = 0, lease_until = NULL '
+            'WHERE status = ?',
+            (PENDING, FAILED),
+        )
+        return cursor.rowcount
+
+    def claim(self) -> str | None:
+        """Take the next job or return None if nothing can be taken now."""
+        now = time.time()
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            # Задачи с истекшей арендой и без оставшихся попыток - провалены.
+            self.connection.execute(
+                '''
+                UPDATE jobs SET status = ?, error = 'lease expired'
+                WHERE status = ? AND lease_until < ? AND attempts >= ?
+                ''',
+                (FAILED, RUNNING, now, self.max_attempts),
+            )
+            row = self.connection.execute(
+                '''
+                SELECT url FROM jobs
+                WHERE attempts < ? AND (
+                    status = ? OR (status = ? AND lease_until < ?)
+                )
+                ORDER BY rowid LIMIT 1
+                ''',
+                (self.max_attempts, PENDING, RUNNING, now),
+            ).fetchone()
+            if row is not None:
+                self.connection.execute(
+                    '''
+                    UPDATE jobs
+                    SET status = ?, attempts = attempts + 1, lease_until = ?
+                    WHERE url = ?
+                    ''',
+                    (RUNNING, now + self.lease, row[0]),
+                )
+            self.connection.execute('COMMIT')
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        return None if row is None else row[0]
+
+    def complete(self, url: str, result: str) -> None:
+        """Mark job as done and save its result."""
+        self.connection.execute(
+            'UPDATE jobs SET status = ?, result = ?, error = NULL '
+            'WHERE url = ?',
+            (DONE, result, url),
+        )
+
+    def fail(self, url: str, error: str) -> None:
+        """Return job to the queue or mark it failed if attempts are over."""
+        self.connection.execute(
+            'UPDATE jobs SET status = CASE WHEN attempts < ? THEN ? ELSE ? '
+            'END, lease_until = NULL, error = ? WHERE url = ?',
+            (self.max_attempts, PENDING, FAILED, error, url),
+        )
+
+    def counts(self) -> dict[str, int]:
+        """Return number of jobs by status."""
+        rows = self.connection.execute(
+            'SELECT status, COUNT(*) FROM jobs GROUP BY status'
+        )
+        return {status: count for status, count in rows}
+
+    def is_finished(self) -> bool:
+        """Return True if there are no jobs left to do."""
+        row = self.connection.execute(
+            'SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)',
+            (PENDING, RUNNING),
+        ).fetchone()
+        return row[0] == 0
+
+    def results(self) -> Iterator[tuple[str, str]]:
+        """Return (url, result) of all finished jobs."""
+        rows = self.connection.execute(
+            'SELECT url, result FROM jobs WHERE status = ? ORDER BY rowid',
+            (DONE,),
+        )
+        yield from rows
@@ -1,5 +1,6 @@
 from selenium.webdriver.common.action_chains import ActionChains
 
+from browser.forms import fill_form
 from lesson02.geckodriver import cursor_script
 from lesson02.geckodriver import driver
 
@@ -47,3 +48,22 @@ register_button = driver.find_element('xpath', '//button[text()=" Register "]')
     .click()
     .perform()
 )
+
+
+# Тоже самое можно сделать быстрее: `fill_form` вводит и проверяет все поля
+# одним скриптом (с событиями input, change и blur). Дату удобнее вводить с
+# клавиатуры, браузер сам разбирает `12282024` в `2024-12-28`.
+driver.get('https://practice.expandtesting.com/form-validation')
+pickup_date_locator = ('xpath', '//input[@name="pickupdate"]')
+fill_form(
+    driver,
+    {
+        ('xpath', '//input[@name="ContactName"]'): 'Pythonist',
+        ('xpath', '//input[@name="contactnumber"]'): '012-3456789',
+        pickup_date_locator: '12282024',
+        ('xpath', '//select[@name="payment"]'): 'cashondelivery',
+    },
+    keystrokes=[pickup_date_locator],
+    expected={pickup_date_locator: '2024-12-28'},
+)
+driver.find_element('xpath', '//button[text()=" Register "]').click()
@@ -1,8 +1,12 @@
 from selenium.webdriver import Chrome
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 
+from browser.driver_cache import resolve_driver
+from browser.lean import LeanProfile
+from browser.lean import apply_lean_chrome
+from browser.lean import block_urls
+from config.settings import get_run_preset
 from config.settings import set_new_folder_or_get_existent
 
 
@@ -58,31 +62,43 @@ prefs = {
     'download.default_directory': chrome_download_dir,
     # Не просить подтверждения если (False).
     'download.prompt_for_download': False,
+    # Разрешить странице скачивать несколько файлов без вопроса (1).
+    'profile.default_content_setting_values.automatic_downloads': 1,
 }
 options.add_experimental_option('prefs', prefs)
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# "Легкий" профиль: не загружать картинки, медиа и счетчики аналитики (prefs
+# выше сохраняются). Шрифты и шаблоны URL блокируются после запуска браузера
+# через CDP: block_urls(driver, LeanProfile()) (create_chrome делает это сам).
+# Включается пресетом (RUN_PRESET=scrape-max или RUN_LEAN=1).
+lean = LeanProfile() if get_run_preset().lean else None
+if lean is not None:
+    apply_lean_chrome(options, lean)
 # =============================================================================
 
 
-# =============================================================================
-# Устанавливаем драйвер и передаем сделанные настройки в браузер.
-# =============================================================================
-service = Service(ChromeDriverManager().install())
-driver = Chrome(options=options, service=service)
-# =============================================================================
+if __name__ == '__main__':
+    # =========================================================================
+    # Устанавливаем драйвер и передаем сделанные настройки в браузер.
+    # =========================================================================
+    service = Service(resolve_driver('chrome'))
+    driver = Chrome(options=options, service=service)
+    if lean is not None:
+        block_urls(driver, lean)
+    # =========================================================================
 
+    # =========================================================================
+    # Браузер google-chrome закрывается сам после выполнения кода.
+    # =========================================================================
+    driver.get('https://expired.badssl.com/')
 
-# =============================================================================
-# Браузер google-chrome закрывается сам после выполнения кода.
-# =============================================================================
-driver.get('https://expired.badssl.com/')
-
-# !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-# Изменение размера окна в процессе выполнения кода (так лучше не делать)
-# а если это необходимо например для проверки чего нибудь то необходимо
-# возвращать первоначальный размер (как в настройках) что-бы не было такого как
-# в замечании ОЧЕНЬ ВАЖНО! Всегда стоит фиксировать размер экрана. ...
-driver.set_window_size(500, 500)
-# Делаем что-то
-driver.set_window_size(1920, 1080)
-print(driver.title)
-# !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+    # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+    # Изменение размера окна в процессе выполнения кода (так лучше не делать) а
+    # если это необходимо например для проверки чего нибудь то необходимо
+    # возвращать первоначальный размер (как в настройках) что-бы не было такого
+    # как в замечании ОЧЕНЬ ВАЖНО! Всегда стоит фиксировать размер экрана. ...
+    driver.set_window_size(500, 500)
+    # Делаем что-то
+    driver.set_window_size(1920, 1080)
+    print(driver.title)
+    # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
@@ -1,8 +1,13 @@
 from selenium.webdriver import Firefox
 from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.firefox.service import Service
-from webdriver_manager.firefox import GeckoDriverManager
 
+from browser.driver_cache import resolve_driver
+from browser.lean import LeanProfile
+from browser.lean import apply_lean_firefox
+from browser.profiles import delete_profile_clone
+from browser.profiles import get_profile_clone
+from config.settings import get_run_preset
 from config.settings import set_new_folder_or_get_existent
 
 
@@ -31,8 +36,8 @@ options.add_argument('--devtools')
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # Загрузка профиля firefox или создание нового. Профиль нужен для хранения
 # настроек, закладок, паролей, ... (профиль необходим даже в режиме private!)
-options.add_argument('--profile')
-options.add_argument(set_new_folder_or_get_existent('firefox_profile'))
+# Аргумент `--profile <копия шаблона>` добавляется перед запуском браузера
+# (см. ниже), что-бы импорт настроек не копировал профиль.
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # --width=<int> --height=<int> указать какого размера должно быть окно
 # браузера при его запуске (данный способ предпочтительнее).
@@ -56,37 +61,53 @@ options.set_preference(
     'browser.download.dir', set_new_folder_or_get_existent('firefox_download')
 )
 options.set_preference('browser.download.folderList', 2)
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# "Легкий" профиль: не загружать картинки, шрифты, медиа и счетчики аналитики
+# (хосты счетчиков блокируются через proxy auto-config). Со стратегией
+# 'normal' страница считается загруженной быстрее, трафика меньше.
+# Включается пресетом (RUN_PRESET=scrape-max или RUN_LEAN=1), так как
+# страницы без картинок и шрифтов выглядят не так как у пользователя.
+# Сколько байт сэкономлено: python -m browser.lean <url> [<url> ...]
+if get_run_preset().lean:
+    apply_lean_firefox(options, LeanProfile())
 # =============================================================================
 
 
-# =============================================================================
-# Устанавливаем драйвер и передаем сделанные настройки в браузер.
-# =============================================================================
-service = Service(GeckoDriverManager().install())
-driver = Firefox(options=options, service=service)
-# =============================================================================
-
+if __name__ == '__main__':
+    # =========================================================================
+    # Устанавливаем драйвер и передаем сделанные настройки в браузер.
+    # =========================================================================
+    profile_clone = get_profile_clone()
+    options.add_argument('--profile')
+    options.add_argument(profile_clone)
+    service = Service(resolve_driver('firefox'))
+    driver = Firefox(options=options, service=service)
+    # =========================================================================
 
-# =============================================================================
-# Браузер firefox сам не закрывается после выполнения кода, в --headless режиме
-# такое дело не нужно допускать так как будет куча ненужных процессов.
-# =============================================================================
-try:
-    driver.get('https://expired.badssl.com/')
-    print(driver.title)
-    # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-    # Изменение размера окна в процессе выполнения кода (так лучше не делать)
-    # а если это необходимо например для проверки чего нибудь то необходимо
-    # возвращать первоначальный размер (как в настройках) что-бы не было такого
-    # как в замечании ОЧЕНЬ ВАЖНО! Всегда стоит фиксировать размер экрана. ...
-    driver.set_window_size(500, 500)
-    # Делаем что-то
-    driver.set_window_size(1920, 1080)
-    # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+    # =========================================================================
+    # Браузер firefox сам не закрывается после выполнения кода, в --headless
+    # режиме такое дело не нужно допускать так как будет куча ненужных
+    # процессов.
+    # =========================================================================
+    try:
+        driver.get('https://expired.badssl.com/')
+        print(driver.title)
+        # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+        # Изменение размера окна в процессе выполнения кода (так лучше не
+        # делать) а если это необходимо например для проверки чего нибудь то
+        # необходимо возвращать первоначальный размер (как в настройках)
+        # что-бы не было такого как в замечании ОЧЕНЬ ВАЖНО! Всегда стоит
+        # фиксировать размер экрана. ...
+        driver.set_window_size(500, 500)
+        # Делаем что-то
+        driver.set_window_size(1920, 1080)
+        # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
 
-except Exception as exception:
-    print(str(exception))
-finally:
-    driver.close()
-    driver.quit()
-# =============================================================================
+    except Exception as exception:
+        print(str(exception))
+    finally:
+        driver.close()
+        driver.quit()
+        # Копия профиля больше не нужна (иначе удалится при выходе).
+        delete_profile_clone(profile_clone)
+    # =========================================================================
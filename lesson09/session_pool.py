@@ -0,0 +1,34 @@
+import copy
+
+from browser.factory import create_chrome
+from browser.factory import create_firefox
+from browser.pool import SessionPool
+from lesson09.chrome_settings import options as chrome_options
+from lesson09.firefox_settings import options as firefox_options
+
+
+def get_firefox_pool(size: int) -> SessionPool:
+    """Return pool of firefox sessions with options from firefox_settings.
+
+    Each browser gets its own temporary profile. BiDi lets the pool clear
+    cookies of all domains between jobs without restarting the browser.
+    """
+    options = copy.deepcopy(firefox_options)
+    options.set_capability('webSocketUrl', True)
+    return SessionPool(factory=lambda: create_firefox(options), size=size)
+
+
+def get_chrome_pool(size: int) -> SessionPool:
+    """Return pool of google-chrome sessions with chrome_settings options."""
+    return SessionPool(
+        factory=lambda: create_chrome(chrome_options), size=size
+    )
+
+
+if __name__ == '__main__':
+    # Браузеры запускаются один раз, а задачи получают уже готовую сессию.
+    with get_firefox_pool(size=2) as pool:
+        for url in ('https://expired.badssl.com/', 'https://example.com/'):
+            with pool.session() as driver:
+                driver.get(url)
+                print(driver.title)
@@ -2,8 +2,11 @@ from selenium.webdriver import Firefox
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.firefox.service import Service
-from webdriver_manager.firefox import GeckoDriverManager
 
+from browser.downloads import DownloadWatcher
+from browser.downloads import download_links
+from browser.driver_cache import resolve_driver
+from browser.profiles import get_profile_clone
 from config.settings import set_new_folder_or_get_existent
 
 
@@ -29,18 +32,22 @@ document.addEventListener('mousemove', function(e) {
 options = Options()
 # Профиль.
 options.add_argument('--profile')
-options.add_argument(set_new_folder_or_get_existent('firefox_profile'))
+options.add_argument(get_profile_clone())
 # Папка download.
 download_dir = set_new_folder_or_get_existent('firefox_download')
 options.set_preference('browser.download.dir', download_dir)
 options.set_preference('browser.download.folderList', 2)
+# Сохраняем файлы без диалога.
+options.set_preference(
+    'browser.helperApps.neverAsk.saveToDisk', 'application/octet-stream'
+)
 # Панель разработчика.
 options.add_argument('--devtools')
 # Размер окна.
 options.add_argument('--width=1920')
 options.add_argument('--height=1080')
 # Установка драйвера.
-service = Service(GeckoDriverManager().install())
+service = Service(resolve_driver('firefox'))
 driver = Firefox(options=options, service=service)
 
 
@@ -48,4 +55,21 @@ driver.get('https://practice.expandtesting.com/download')
 driver.execute_script(cursor_script)
 ac = ActionChains(driver)
 downloads = driver.find_elements('xpath', '//a[@download=""]')
-ac.move_to_element(downloads[0]).click().perform()
+# Загрузка закончена когда браузер переименует `.part` файл, ждем этого
+# события вместо `sleep`.
+with DownloadWatcher(download_dir) as watcher:
+    ac.move_to_element(downloads[0]).click().perform()
+    download = watcher.wait(1)[0]
+print(f'{download.path}: {download.size} байт, sha256 {download.sha256}')
+
+# Все файлы страницы скачиваются параллельно напрямую по HTTP с cookies
+# сессии браузера, о каждом готовом файле сообщает `on_complete`.
+files = download_links(
+    driver,
+    '//a[@download=""]',
+    download_dir,
+    mode='http',
+    workers=8,
+    on_complete=lambda download: print('Скачан', download.path),
+)
+print(f'Скачано файлов: {len(files)}.')
@@ -1,53 +1,72 @@
 import os
-import platform
 import re
-import time
 
 from datetime import date
+from functools import partial
+from pprint import pprint
+from urllib.parse import urljoin
+from urllib.parse import urlparse
 
-from selenium.webdriver import Firefox
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.firefox.options import Options
-from selenium.webdriver.firefox.service import Service
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.wait import WebDriverWait
-
-from webdriver_manager.firefox import GeckoDriverManager
 
+from browser.factory import get_firefox_options
+from browser.factory import lazy_firefox
+from browser.forms import fill_form
+from browser.instrumentation import get_stats
+from browser.lean import LeanProfile
+from browser.session_store import SessionStore
+from browser.session_store import has_key
+from browser.session_store import is_session_valid
+from browser.waits import AdaptiveWait
+from browser.waits import clickable
+from browser.waits import present
+from browser.waits import settled
+from browser.waits import visible
+from config.settings import get_run_preset
 from config.settings import set_new_folder_or_get_existent
-
-
-HOME_PAGE = 'https://lk.ric-ul.ru/'
+from traingin_selenium.basket import BasketVerifier
+from traingin_selenium.flow import Flow
+from traingin_selenium.locators import locators
+from traingin_selenium.providers import Provider
+from traingin_selenium.providers import providers
+
+
+# Адрес портала можно заменить на тестовый: traingin_selenium/fake_portal.py.
+HOME_PAGE = os.getenv('RIZ_HOME_PAGE', 'https://lk.ric-ul.ru/')
+BASKET_PAGE = urljoin(HOME_PAGE, 'Basket')
+# Новые показания счетчиков не запрашиваются, а увеличиваются на 1.
+AUTO_READINGS = os.getenv('RIZ_AUTO_READINGS', '0').lower() in ('1', 'true')
 RIZ_LOGIN = os.getenv('RIZ_LOGIN')
 RIZ_PASSWORD = os.getenv('RIZ_PASSWORD')
 SEND_TO_EMAIL = os.getenv('SEND_TO_EMAIL')
 WATER_ACCOUNT_NUM = os.getenv('WATER_ACCOUNT_NUM')      # ЛC воды.
-REPAIR_ACCOUNT_NUM = os.getenv('REPAIR_ACCOUNT_NUM')    # ЛC кап. ремонта.
-HEATING_ACCOUNT_NUM = os.getenv('HEATING_ACCOUNT_NUM')  # ЛC отопления.
-GAS_ACCOUNT_NUM = os.getenv('GAS_ACCOUNT_NUM')          # ЛC газа.
-ENERGY_ACCOUNT_NUM = os.getenv('ENERGY_ACCOUNT_NUM')    # ЛC электроэнергии.
+# Номера лицевых счетов оплачиваемых услуг берутся из переменных окружения
+# указанных в `providers.account_env`.
 
 # =============================================================================
 # Настройка браузера перед запуском.
 # =============================================================================
 
 
-options = Options()
-options.add_argument('--private-window')
-options.add_argument('--devtools')
-options.add_argument('--width=1920')
-options.add_argument('--height=1080')
-options.add_argument('--profile')
-options.add_argument(set_new_folder_or_get_existent('firefox_profile'))
-
-service = Service(executable_path=GeckoDriverManager().install())
-driver = Firefox(options=options, service=service)
-
+# Окно, панель разработки, загрузка страниц и таймауты берутся из пресета
+# (RUN_PRESET=ci-fast для запуска без окна, см. config/settings.py).
+preset = get_run_preset()
+options = get_firefox_options(
+    private=True,
+    # Не загружаем картинки, шрифты и счетчики аналитики портала.
+    lean=LeanProfile(),
+    preset=preset,
+)
 
-driver.get(HOME_PAGE)
+# Браузер запустится при первом обращении к нему с копией профиля.
+driver = lazy_firefox(options, preset, profile='firefox_profile')
 ac = ActionChains(driver)
-driver_wait = WebDriverWait(driver=driver, timeout=10, poll_frequency=2)
+# Первые проверки идут часто, затем реже (не чаще чем раз в 0.5 секунды).
+driver_wait = AdaptiveWait(driver=driver, timeout=preset.wait_timeout)
+# Наличие услуг в корзине проверяется одним запросом в конце работы.
+basket = BasketVerifier(driver, BASKET_PAGE)
 
 
 # =============================================================================
@@ -55,40 +74,54 @@ driver_wait = WebDriverWait(driver=driver, timeout=10, poll_frequency=2)
 # =============================================================================
 
 
-def check_added_service_in_basket(service_name: str):
-    driver.get('https://lk.ric-ul.ru/Basket')
-    SERVICE_NAME = ('xpath', f'//*[contains(text(), \'{service_name}\')]')
-    elements = driver.find_elements(*SERVICE_NAME)
-    if elements == list():
-        assert False, f'Услуги `{service_name}` нет в корзине.'
-    driver.get(HOME_PAGE)
-
-
-def clear_field(field):
-    select_all = Keys.CONTROL + 'a'
-    # Если ОС пользователя Mac то вместо Ctrl нажимаем Command.
-    if platform.system() == 'Darwin':
-        select_all = Keys.COMMAND + 'a'
-    field.send_keys(select_all + Keys.BACKSPACE)
+def ask_new_reading(
+        name: str,
+        regex: str,
+        last_value: int | float,
+) -> int | float:
+    if AUTO_READINGS:
+        # Для прогонов без человека (тестовый портал, CI).
+        return round(last_value + 1, 3)
+    # Запрашиваем новое показание у пользователя, проверяем его значение.
+    new_value: int | float = 0
+    while new_value <= last_value:
+        print(f'Введите показатель {name}, БОЛЬШЕ чем {last_value}.')
+        new_value = convert_string_to_number(
+            regex=regex,
+            value=input('Новое показание: '),
+        )
+    return new_value
 
 
 def click_button_with_text(button_text: str):
     # Находим кнопку с текстом `button_text` и нажимаем на неё.
-    BUTTON = ('xpath', f'//button[text()=\'{button_text}\']')
-    button = driver_wait.until(EC.element_to_be_clickable(BUTTON))
+    button = locators.until(
+        driver_wait,
+        EC.element_to_be_clickable,
+        'button_with_text',
+        text=button_text,
+    )
     button.click()
 
 
 def click_card_with_text(text: str):
     # Находим карточку с текстом `text` ждем её кликабельность и кликаем её.
-    CARD = ('xpath', f'//b[text()=\'{text}\']')
-    card = driver_wait.until(EC.visibility_of_element_located(CARD))
+    card = locators.until(
+        driver_wait,
+        EC.visibility_of_element_located,
+        'card_with_text',
+        text=text,
+    )
     card.click()
 
 
 def click_href_with_attribute(id_value: str):
-    HREF = ('xpath', f'//a[@id=\'{id_value}\']')
-    driver_wait.until(EC.visibility_of_element_located(HREF)).click()
+    locators.until(
+        driver_wait,
+        EC.visibility_of_element_located,
+        'href_with_id',
+        id_value=id_value,
+    ).click()
 
 
 def convert_string_to_number(regex: str, value: str) -> int | float:
@@ -102,59 +135,72 @@ def convert_string_to_number(regex: str, value: str) -> int | float:
     return to_number_func(value)
 
 
-def get_element_text(element_xpath: str):
-    ELEMENT = ('xpath', element_xpath)
-    element = driver_wait.until(EC.visibility_of_element_located(ELEMENT))
+def fill_inputs_with_attr(
+    attr_name: str, values: dict[str, str], keystrokes: tuple[str, ...] = ()
+):
+    # Находим поля с атрибутом `{attr_name}="{ключ values}"`, ждем их все
+    # одной проверкой. Значения вводятся и проверяются одним скриптом с
+    # событиями input, change и blur, последнее поле остается в фокусе.
+    # Поля `keystrokes` вводятся с клавиатуры, что-бы сработали обработчики
+    # клавиш сайта (например форматирование даты).
+    fields = dict()
+    typed = list()
+    for attr_value, value in values.items():
+        locator = locators.get(
+            'input_with_attr', attr_name=attr_name, attr_value=attr_value
+        )
+        fields[locator] = value
+        if attr_value in keystrokes:
+            typed.append(locator)
+    with locators.track('input_with_attr'):
+        driver_wait.until_all(*map(clickable, fields))
+    fill_form(driver, fields, keystrokes=typed)
+
+
+def get_state_path(name: str) -> str:
+    # Сессия и прогресс хранятся отдельно для каждого портала (тестового и
+    # настоящего), иначе прогон на тестовом портале "оплатит" месяц.
+    host = urlparse(HOME_PAGE).netloc.replace(':', '_')
+    folder = set_new_folder_or_get_existent('payment')
+    return os.path.join(folder, f'{host}-{name}')
+
+
+def get_element_text(locator_name: str, **params: str):
+    element = locators.until(
+        driver_wait, EC.visibility_of_element_located, locator_name, **params
+    )
     return element.text
 
 
 def get_service_name() -> str:
     # Ищем скрытое поле в котором хранится название оплачиваемого сервиса.
-    SERVICE_NAME_FIELD = ('xpath', '//input[@id="serviceName"]')
-    service_name_field = driver_wait.until(
-        EC.presence_of_element_located(SERVICE_NAME_FIELD)
+    service_name_field = locators.until(
+        driver_wait, EC.presence_of_element_located, 'service_name_field'
     )
     return service_name_field.get_attribute('value')
 
 
 def select_checkbox_with_text(text: str):
-    # Находим чекбокс с `text()={text}`.
-    CHECKBOX_CHECK = ('xpath', f'//span[text()=\'{text}\']/../input')
-    CHECKBOX_CLICK = ('xpath', f'//span[text()=\'{text}\']')
-    checkbox_check = driver_wait.until(
-        EC.presence_of_element_located(CHECKBOX_CHECK)
-    )
-    checkbox_click = driver_wait.until(
-        EC.visibility_of_element_located(CHECKBOX_CLICK)
-    )
+    # Находим чекбокс с `text()={text}`, оба элемента ждем одной проверкой.
+    CHECKBOX_CHECK = locators.get('checkbox_input', text=text)
+    CHECKBOX_CLICK = locators.get('checkbox_label', text=text)
+    with locators.track('checkbox_input'):
+        checkbox_check, checkbox_click = driver_wait.until_all(
+            present(CHECKBOX_CHECK), visible(CHECKBOX_CLICK)
+        )
     # Если чекбокс с `text()={text}` не выбрана, то выбираем её.
     if checkbox_check.is_selected() is not True:
         checkbox_click.click()
     # Проверяем выбран ли необходимый чекбокс.
-    checkbox_check = driver_wait.until(
-        EC.presence_of_element_located(CHECKBOX_CHECK)
+    checkbox_check = locators.until(
+        driver_wait,
+        EC.presence_of_element_located,
+        'checkbox_input',
+        text=text,
     )
     assert checkbox_check.is_selected()
 
 
-def type_value_in_input_with_attr(
-        attr_name: str,
-        attr_value: str,
-        field_value: str,
-):
-    # Находим поле с атрибутом `{attr_name}="{attr_value}"`.
-    FIELD = ('xpath', f'//input[@{attr_name}=\'{attr_value}\']')
-    field = driver_wait.until(EC.element_to_be_clickable(FIELD))
-    # Очищаем поле и вводим в него значение `field_value`.
-    clear_field(field)
-    field.click()
-    field.send_keys(field_value)
-    # Убеждаемся в том, что переданное значение введено корректно.
-    assert driver_wait.until(
-        EC.text_to_be_present_in_element_value(FIELD, field_value)
-    )
-
-
 # =============================================================================
 # АВТОРИЗАЦИЯ.
 # =============================================================================
@@ -162,23 +208,44 @@ def type_value_in_input_with_attr(
 
 def click_to_authentication_button():
     # Находим кнопку авторизации и нажимаем на неё.
-    AUTH_BUTTON = ('xpath', '//a[@class="profile-login-btn"]')
-    driver_wait.until(EC.presence_of_element_located(AUTH_BUTTON)).click()
+    locators.until(
+        driver_wait, EC.presence_of_element_located, 'auth_button'
+    ).click()
 
 
-click_to_authentication_button()
-type_value_in_input_with_attr(
-    attr_name='id',
-    attr_value='Input_Login',
-    field_value=RIZ_LOGIN,
-)
-type_value_in_input_with_attr(
-    attr_name='id',
-    attr_value='Input_Password',
-    field_value=RIZ_PASSWORD
-)
-ac.send_keys(Keys.ENTER).perform()
-print('*' * 5, 'Авторизация прошла успешно!', '*' * 5)
+def authenticate():
+    driver.get(HOME_PAGE)
+    click_to_authentication_button()
+    fill_inputs_with_attr(
+        attr_name='id',
+        values={'Input_Login': RIZ_LOGIN, 'Input_Password': RIZ_PASSWORD},
+    )
+    # Ждем пока завершится вход и загрузится страница пользователя.
+    with settled(driver):
+        ac.send_keys(Keys.ENTER).perform()
+    print('*' * 5, 'Авторизация прошла успешно!', '*' * 5)
+
+
+def restore_session_or_authenticate():
+    # Сессия сохраняется в зашифрованный файл, пока она жива повторно
+    # авторизоваться не нужно. Гостю показывается кнопка входа. Без ключа
+    # (SESSION_STORE_KEY) сессия не сохраняется.
+    if not has_key():
+        authenticate()
+        return
+    store = SessionStore(get_state_path('session'))
+    restored = store.restore(driver, HOME_PAGE)
+    if restored and is_session_valid(
+        driver, HOME_PAGE, marker='profile-login-btn'
+    ):
+        print('*' * 5, 'Сессия восстановлена!', '*' * 5)
+        return
+    if restored:
+        # Куки умершей сессии не должны мешать новой авторизации.
+        store.discard(driver)
+    authenticate()
+    driver.get(HOME_PAGE)
+    store.save(driver)
 
 
 # =============================================================================
@@ -188,309 +255,168 @@ print('*' * 5, 'Авторизация прошла успешно!', '*' * 5)
 
 def set_new_water_data():
     # Получаем два элемента счетчика первый `ГВС`, второй `ХВС`.
-    INDICATORS = ('xpath', '//div[@class="indication-table-body"]')
-    indicators = driver_wait.until(
-        EC.visibility_of_all_elements_located(INDICATORS)
+    indicators = locators.until(
+        driver_wait, EC.visibility_of_all_elements_located, 'indicators'
     )
     for indicator in indicators:
         # Последний переданный показатель счетчика в цифрах `99.999`.
-        LAST_VALUE = ('xpath', './/input[@readonly="readonly"]')
+        LAST_VALUE = locators.get('indicator_last_value')
         last_value = indicator.find_element(*LAST_VALUE).get_attribute('value')
         last_value = float(last_value)
 
         # Tип счетчика `ГВС` или `ХВС`.
-        INDICATOR = ('xpath', './/div[@class="indication-table-type"]')
+        INDICATOR = locators.get('indicator_type')
         _indicator = indicator.find_element(*INDICATOR).text
 
         # Просим ввести новые показатели воды и преобразовываем в число.
-        new_value = 0
-        while new_value <= last_value:
-            print(f'Введите показатель {_indicator}, БОЛЬШЕ чем {last_value}.')
-            new_value = input('Новое показание: ')
-            new_value = convert_string_to_number(
-                regex=r'[\d]*[.]?[\d]{1,3}',
-                value=new_value,
-            )
+        new_value = ask_new_reading(
+            name=_indicator,
+            regex=r'[\d]*[.]?[\d]{1,3}',
+            last_value=last_value,
+        )
 
         # Вводим введенные пользователем значения в поля
-        INPUT_FIELD = ('xpath', './/input[contains(@class, "new-indication")]')
+        INPUT_FIELD = locators.get('indicator_input')
         input_field = indicator.find_element(*INPUT_FIELD)
         input_field.send_keys(new_value)
         assert input_field.get_attribute('value') == str(new_value)
 
 
-# Находим карточку `Ввод показаний ЖКУ` и кликаем на нее.
-click_card_with_text('Ввод показаний ЖКУ')
-# Выбираем передачу `По лицевому счету`.
-select_checkbox_with_text('По лицевому счету')
-# Вводим номер лицевого счета в поле `Номер лицевого счета`.
-type_value_in_input_with_attr(
-    attr_name='id',
-    attr_value='AccountNumberValue',
-    field_value=WATER_ACCOUNT_NUM,
-)
-# Нажимаем кнопку enter и идем дальше.
-ac.send_keys(Keys.ENTER).perform()
-# Запрашиваем и вводим новые показатели счетчиков.
-set_new_water_data()
-# Находим кнопку отправки данных и нажимаем на нее.
-SEND_DATA_BUTTON_LOCATOR = ('xpath', '//button[text()="Отправить показания"]')
-driver_wait.until(EC.element_to_be_clickable(SEND_DATA_BUTTON_LOCATOR)).click()
-# Закрываем окно с результатом передачи данных (ОК - на кириллице).
-OK_BUTTON_LOCATOR = ('xpath', '//button[@class="primary-btn" and text()="ОК"]')
-driver_wait.until(EC.element_to_be_clickable(OK_BUTTON_LOCATOR)).click()
-print('*' * 5, 'Новые показания счетчиков воды успешно переданы!', '*' * 5)
-
-
-# =============================================================================
-# ОПЛАТА ГАЗА.
-# =============================================================================
-
-
-driver.get(HOME_PAGE)
-# Находим карточку `ПАО "Т Плюс"` и нажимаем на неё.
-click_card_with_text('ООО "Газпром межрегионгаз Ульяновск"')
-# Вводим номер лицевого счета.
-type_value_in_input_with_attr(
-    attr_name='id',
-    attr_value='group-1-field-0-value',
-    field_value=GAS_ACCOUNT_NUM
-)
-# Нажимаем на enter и идем дальше.
-ac.send_keys(Keys.ENTER).perform()
-# Выберем чекбокс `Многоквартирные дома (6.81 руб./1 куб.м)` и кликнем на него.
-select_checkbox_with_text('Многоквартирные дома (6.81 руб./1 куб.м)')
-
-
-# Находим поле с предыдущем показанием и сохраняем его значение.
-xpath = '//td[contains(@class, "pay-gazul-old")]'
-last_gas_data = get_element_text(xpath)
-# Преобразовываем строку в float или int.
-last_gas_data = convert_string_to_number(
-    regex=r'[\d]*[.]?[\d]{1,2}',
-    value=last_gas_data,
-)
-
-# Запрашиваем новое показание у пользователя, проверяем переданное значение.
-new_gas_data = 0
-while new_gas_data <= last_gas_data:
-    print(f'Введите показатель ГАЗА, БОЛЬШЕ чем {last_gas_data}.')
-    new_gas_data = input('Новое показание: ')
-    new_gas_data = convert_string_to_number(
-        regex=r'[\d]*[.]?[\d]{1,2}',
-        value=new_gas_data,
+def send_water_readings():
+    driver.get(HOME_PAGE)
+    # Находим карточку `Ввод показаний ЖКУ` и кликаем на нее.
+    click_card_with_text('Ввод показаний ЖКУ')
+    # Выбираем передачу `По лицевому счету`.
+    select_checkbox_with_text('По лицевому счету')
+    # Вводим номер лицевого счета в поле `Номер лицевого счета`.
+    fill_inputs_with_attr(
+        attr_name='id', values={'AccountNumberValue': WATER_ACCOUNT_NUM}
     )
-
-# Ищем поле `Новое показание` и вводим переданное пользователем значение.
-type_value_in_input_with_attr(
-    attr_name='class',
-    attr_value='form-input newReading',
-    field_value=str(new_gas_data),
-)
-# Нажимаем на кнопку `Произвести расчет`.
-click_href_with_attribute('calcButton')
-# После нажатия на кнопку выполняется скрипт... Ждем пару секунд.
-time.sleep(2)
-# Выбираем необходимый способ оплаты (пробел в конце не опечатка так в HTML).
-select_checkbox_with_text('Система быстрых платежей Банка России ')
-# Сохраняем название сервиса, что-бы затем проверить добавился ли он в корзину.
-SERVICE_NAME = get_service_name()
-# Находим кнопку `Добавить в корзину` и нажимаем на неё.
-click_button_with_text('Добавить в корзину')
-# Проверяем добавлена ли услуга в корзину.
-check_added_service_in_basket(SERVICE_NAME)
-print('*' * 5, f'Услуга `{SERVICE_NAME}` добавлена в корзину!', '*' * 5)
+    # Нажимаем кнопку enter и идем дальше.
+    ac.send_keys(Keys.ENTER).perform()
+    # Запрашиваем и вводим новые показатели счетчиков.
+    set_new_water_data()
+    # Находим кнопку отправки данных и нажимаем на нее.
+    click_button_with_text('Отправить показания')
+    # Закрываем окно с результатом передачи данных (ОК - на кириллице).
+    locators.until(
+        driver_wait, EC.element_to_be_clickable, 'ok_button', text='ОК'
+    ).click()
+    print('*' * 5, 'Новые показания счетчиков воды успешно переданы!', '*' * 5)
 
 
 # =============================================================================
-# ОПЛАТА ЭЛЕКТРОЭНЕРГИИ.
+# ОПЛАТА УСЛУГ.
 # =============================================================================
 
 
-# Находим карточку `АО "Ульяновскэнерго"` и нажимаем на неё.
-click_card_with_text('АО "Ульяновскэнерго"')
-# Вводим номер лицевого счета.
-type_value_in_input_with_attr(
-    attr_name='id',
-    attr_value='group-1-field-0-value',
-    field_value=ENERGY_ACCOUNT_NUM
-)
-# Вводим период оплаты.
-pay_period = f'{date.today().month}.{date.today().year}'
-type_value_in_input_with_attr(
-    attr_name='id',
-    attr_value='group-1-field-1-value',
-    field_value=pay_period
-)
-# Нажимаем enter что-бы введенная дата преобразовалась в нужный формат.
-ac.send_keys(Keys.ENTER).perform()
-# Нажимаем на enter и идем дальше.
-ac.send_keys(Keys.ENTER).perform()
-
-
-# Находим поле с предыдущем показанием и сохраняем его значение.
-xpath = '//td[contains(@class, "pay-ulenergo-old")]'
-last_energy_data = get_element_text(xpath)
-# Преобразовываем строку в int.
-last_energy_data = convert_string_to_number(
-    regex=r'[\d]+',
-    value=last_energy_data
-)
-
-# Запрашиваем новое показание у пользователя, проверяем переданное значение.
-new_energy_data = 0
-while new_energy_data <= last_energy_data:
-    print(f'Введите показатель ЭЛЕКТРОЭНЕРГИИ, БОЛЬШЕ чем {last_energy_data}.')
-    new_energy_data = input('Новое показание: ')
-    new_energy_data = convert_string_to_number(
-        regex=r'[\d]+',
-        value=new_energy_data,
+def pay(provider: Provider):
+    # Каждая услуга начинается с главной страницы, поэтому после сбоя
+    # оплату можно продолжить с любой услуги.
+    driver.get(HOME_PAGE)
+    click_card_with_text(provider.card_text)
+    # Вводим номер лицевого счета и период оплаты (если он нужен).
+    values = {'group-1-field-0-value': os.environ[provider.account_env]}
+    if provider.has_period:
+        pay_period = f'{date.today().month}.{date.today().year}'
+        values['group-1-field-1-value'] = pay_period
+    # Дату сайт преобразует в обработчике клавиш, поэтому период вводится
+    # с клавиатуры (последним, фокус остается на нем).
+    fill_inputs_with_attr(
+        attr_name='id', values=values, keystrokes=('group-1-field-1-value',)
     )
-
-# Ищем поле `Новое показание` и вводим переданное пользователем значение.
-type_value_in_input_with_attr(
-    attr_name='class',
-    attr_value='form-input newReading',
-    field_value=str(new_energy_data),
-)
-# Нажимаем на кнопку `Произвести расчет`.
-click_href_with_attribute('calcButton')
-# После нажатия на кнопку выполняется скрипт... Ждем пару секунд.
-time.sleep(5)
-# Выбираем необходимый способ оплаты (пробел в конце не опечатка так в HTML).
-select_checkbox_with_text('Система быстрых платежей Банка России ')
-# Сохраняем название сервиса, что-бы затем проверить добавился ли он в корзину.
-SERVICE_NAME = get_service_name()
-# Находим кнопку `Добавить в корзину` и нажимаем на неё.
-click_button_with_text('Добавить в корзину')
-# Проверяем добавлена ли услуга в корзину.
-check_added_service_in_basket(SERVICE_NAME)
-print('*' * 5, f'Услуга `{SERVICE_NAME}` добавлена в корзину!', '*' * 5)
-
-
-# =============================================================================
-# ОПЛАТА ВОДЫ.
-# =============================================================================
-
-
-driver.get(HOME_PAGE)
-# Находим карточку `Оплата ... услуг` и нажимаем на неё.
-click_card_with_text('Оплата жилого помещения и коммунальных услуг')
-# Вводим номер лицевого счета.
-type_value_in_input_with_attr(
-    attr_name='id',
-    attr_value='group-1-field-0-value',
-    field_value=WATER_ACCOUNT_NUM
-)
-# Вводим период оплаты.
-pay_period = f'{date.today().month}.{date.today().year}'
-type_value_in_input_with_attr(
-    attr_name='id',
-    attr_value='group-1-field-1-value',
-    field_value=pay_period
-)
-# Нажимаем enter что-бы введенная дата преобразовалась в нужный формат.
-ac.send_keys(Keys.ENTER).perform()
-# Нажимаем на enter и идем дальше.
-ac.send_keys(Keys.ENTER).perform()
-# Находим карточку `Начисление РКЦ Ульяновск` и нажимаем на неё.
-click_card_with_text('Начисление РКЦ Ульяновск')
-# Нажимаем на чекбокс `Оплата с учетом задолженности ...` если он не выбран.
-select_checkbox_with_text('Оплата с учетом задолженности за прошлые периоды')
-# Вводим email куда отправится чек об оплате.
-type_value_in_input_with_attr(
-    attr_name='id',
-    attr_value='email',
-    field_value=SEND_TO_EMAIL
-)
-# Выбираем необходимый способ оплаты (пробел в конце не опечатка так в HTML).
-select_checkbox_with_text('Система быстрых платежей Банка России ')
-# Сохраняем название сервиса, что-бы затем проверить добавился ли он в корзину.
-SERVICE_NAME = get_service_name()
-# Находим кнопку `Добавить в корзину` и нажимаем на неё.
-click_button_with_text('Добавить в корзину')
-# Проверяем добавлена ли услуга в корзину.
-check_added_service_in_basket(SERVICE_NAME)
-print('*' * 5, f'Услуга `{SERVICE_NAME}` добавлена в корзину!', '*' * 5)
-
-
-# =============================================================================
-# ОПЛАТА КАПИТАЛЬНОГО РЕМОНТА.
-# =============================================================================
-
-
-# Находим карточку `Фонд капитального ремонта` и нажимаем на неё.
-click_card_with_text('Фонд капитального ремонта')
-# Вводим номер лицевого счета.
-type_value_in_input_with_attr(
-    attr_name='id',
-    attr_value='group-1-field-0-value',
-    field_value=REPAIR_ACCOUNT_NUM
-)
-# Вводим период оплаты.
-pay_period = f'{date.today().month}.{date.today().year}'
-type_value_in_input_with_attr(
-    attr_name='id',
-    attr_value='group-1-field-1-value',
-    field_value=pay_period
-)
-# Нажимаем enter что-бы введенная дата преобразовалась в нужный формат.
-ac.send_keys(Keys.ENTER).perform()
-# Нажимаем на enter и идем дальше.
-ac.send_keys(Keys.ENTER).perform()
-# Нажимаем на чекбокс `Оплата с учетом задолженности ...` если он не выбран.
-select_checkbox_with_text('Оплата с учетом задолженности за прошлые периоды')
-# Вводим email куда отправится чек об оплате.
-type_value_in_input_with_attr(
-    attr_name='id',
-    attr_value='email',
-    field_value=SEND_TO_EMAIL
-)
-# Сохраняем название сервиса, что-бы затем проверить добавился ли он в корзину.
-SERVICE_NAME = get_service_name()
-# Находим кнопку `Добавить в корзину` и нажимаем на неё.
-click_button_with_text('Добавить в корзину')
-# Проверяем добавлена ли услуга в корзину.
-check_added_service_in_basket(SERVICE_NAME)
-print('*' * 5, f'Услуга `{SERVICE_NAME}` добавлена в корзину!', '*' * 5)
-
-
-# =============================================================================
-# ОПЛАТА ОТОПЛЕНИЯ.
-# =============================================================================
-
-
-# Находим карточку `ПАО "Т Плюс"` и нажимаем на неё.
-click_card_with_text('ПАО "Т Плюс"')
-# Вводим номер лицевого счета.
-type_value_in_input_with_attr(
-    attr_name='id',
-    attr_value='group-1-field-0-value',
-    field_value=HEATING_ACCOUNT_NUM
-)
-# Вводим период оплаты.
-pay_period = f'{date.today().month}.{date.today().year}'
-type_value_in_input_with_attr(
-    attr_name='id',
-    attr_value='group-1-field-1-value',
-    field_value=pay_period
-)
-# Нажимаем enter что-бы введенная дата преобразовалась в нужный формат.
-ac.send_keys(Keys.ENTER).perform()
-# Нажимаем на enter и идем дальше.
-ac.send_keys(Keys.ENTER).perform()
-# Нажимаем на чекбокс `Оплата с учетом задолженности ...` если он не выбран.
-select_checkbox_with_text('Оплата с учетом задолженности за прошлые периоды')
-# Вводим email куда отправится чек об оплате.
-type_value_in_input_with_attr(
-    attr_name='id',
-    attr_value='email',
-    field_value=SEND_TO_EMAIL
-)
-# Сохраняем название сервиса, что-бы затем проверить добавился ли он в корзину.
-SERVICE_NAME = get_service_name()
-# Находим кнопку `Добавить в корзину` и нажимаем на неё.
-click_button_with_text('Добавить в корзину')
-# Проверяем добавлена ли услуга в корзину.
-check_added_service_in_basket(SERVICE_NAME)
-print('*' * 5, f'Услуга `{SERVICE_NAME}` добавлена в корзину!', '*' * 5)
+    if provider.has_period:
+        # Нажимаем enter что-бы введенная дата преобразовалась в нужный формат.
+        ac.send_keys(Keys.ENTER).perform()
+    # Нажимаем на enter и идем дальше.
+    ac.send_keys(Keys.ENTER).perform()
+    if provider.sub_card is not None:
+        click_card_with_text(provider.sub_card)
+    for checkbox_text in provider.checkboxes:
+        select_checkbox_with_text(checkbox_text)
+
+    if provider.reading is not None:
+        # Находим поле с предыдущем показанием и сохраняем его значение.
+        last_value = convert_string_to_number(
+            regex=provider.reading.regex,
+            value=get_element_text(
+                'old_reading', class_name=provider.reading.class_name
+            ),
+        )
+        new_value = ask_new_reading(
+            name=provider.reading.name,
+            regex=provider.reading.regex,
+            last_value=last_value,
+        )
+        # Ищем поле `Новое показание` и вводим новое значение.
+        fill_inputs_with_attr(
+            attr_name='class',
+            values={'form-input newReading': str(new_value)},
+        )
+        # Нажимаем на кнопку `Произвести расчет`. После нажатия выполняется
+        # скрипт, ждем пока DOM перестанет меняться и завершатся все запросы.
+        with settled(driver):
+            click_href_with_attribute('calcButton')
+
+    if provider.send_email:
+        # Вводим email куда отправится чек об оплате.
+        fill_inputs_with_attr(attr_name='id', values={'email': SEND_TO_EMAIL})
+    if provider.payment_method is not None:
+        select_checkbox_with_text(provider.payment_method)
+    # Сохраняем название сервиса, что-бы затем проверить его в корзине.
+    service_name = get_service_name()
+    # Находим кнопку `Добавить в корзину` и нажимаем на неё. Ждем ответ
+    # сервера, иначе переход к следующей услуге может прервать запрос.
+    with settled(driver):
+        click_button_with_text('Добавить в корзину')
+    print('*' * 5, f'Услуга `{service_name}` добавлена в корзину!', '*' * 5)
+    # Название сохраняется в checkpoint, корзина проверяется шагом `basket`.
+    return service_name
+
+
+def verify_basket(flow: Flow):
+    # Проверяются все услуги месяца одним запросом, в том числе добавленные
+    # прошлыми запусками. Отсутствующие в корзине услуги снова считаются
+    # не оплаченными, следующий запуск добавит их заново.
+    services = {
+        flow.get_result(provider.name): provider.name
+        for provider in providers
+        if flow.is_done(provider.name) and flow.get_result(provider.name)
+    }
+    missing = basket.get_missing(list(services))
+    if missing:
+        flow.undo([services[name] for name in missing])
+        names = ', '.join(f'`{name}`' for name in missing)
+        raise AssertionError(f'Услуг {names} нет в корзине.')
+    print('*' * 5, 'Все добавленные услуги есть в корзине!', '*' * 5)
+
+
+def main():
+    # Выполненные шаги сохраняются, повторный запуск в этом же месяце
+    # продолжит работу с первого невыполненного шага.
+    flow = Flow(get_state_path('checkpoint.json'))
+    steps = [('water_readings', send_water_readings)]
+    steps += [(p.name, partial(pay, p)) for p in providers]
+    # Последний шаг: пока корзина не проверена, месяц не считается оплаченным.
+    steps += [('basket', partial(verify_basket, flow))]
+    if not flow.pending(steps):
+        print('*' * 5, 'Все услуги этого месяца уже оплачены!', '*' * 5)
+        return
+
+    restore_session_or_authenticate()
+    try:
+        flow.run(steps)
+    finally:
+        # Сколько времени заняли шаги, локаторы и ожидания.
+        pprint(flow.report())
+        pprint(locators.report())
+        pprint(driver_wait.report())
+        # WEBDRIVER_INSTRUMENTATION=1 - время команд WebDriver по хелперам.
+        stats = get_stats(driver)
+        if stats is not None:
+            pprint(stats.report())
+            stats.write(get_state_path('commands.prom'))
+
+
+if __name__ == '__main__':
+    main()
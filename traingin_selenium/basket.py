@@ -0,0 +1,76 @@
+from typing import Literal
+
+from lxml import html as lxml_html
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from traingin_selenium.locators import locators
+
+
+VerifyMode = Literal['immediate', 'deferred']
+
+# Загружает HTML страницы с куками сессии не уходя с текущей страницы.
+FETCH_HTML_JS = '''
+var url = arguments[0];
+var done = arguments[arguments.length - 1];
+fetch(url, {credentials: 'include', cache: 'no-store'})
+    .then(function (response) { return response.text(); })
+    .then(done)
+    .catch(function () { done(null); });
+'''
+
+
+class BasketVerifier:
+    """Check that added services are in the basket.
+
+    In 'deferred' mode services are collected by `expect` and checked all at
+    once by `verify`, in 'immediate' mode each one is checked on `expect`.
+    The basket is fetched in the background, the opened page stays as is.
+    """
+
+    def __init__(
+        self,
+        driver: WebDriver,
+        basket_url: str,
+        mode: VerifyMode = 'deferred',
+    ) -> None:
+        self.driver = driver
+        self.basket_url = basket_url
+        self.mode = mode
+        self.expected: list[str] = list()
+
+    def fetch_basket(self) -> str:
+        html = self.driver.execute_async_script(FETCH_HTML_JS, self.basket_url)
+        if html is None:
+            raise ConnectionError(f'Failed to fetch {self.basket_url}.')
+        return html
+
+    def get_missing(self, service_names: list[str]) -> list[str]:
+        """Return services which are not in the basket (one request)."""
+        document = lxml_html.fromstring(self.fetch_basket())
+        missing = list()
+        for service_name in service_names:
+            _, xpath = locators.get(
+                'basket_service', service_name=service_name
+            )
+            with locators.track('basket_service'):
+                if not document.xpath(xpath):
+                    missing.append(service_name)
+        return missing
+
+    def expect(self, service_name: str) -> None:
+        if self.mode == 'immediate':
+            self.assert_in_basket([service_name])
+        else:
+            self.expected.append(service_name)
+
+    def assert_in_basket(self, service_names: list[str]) -> None:
+        missing = self.get_missing(service_names)
+        if missing:
+            names = ', '.join(f'`{name}`' for name in missing)
+            raise AssertionError(f'Услуг {names} нет в корзине.')
+
+    def verify(self) -> None:
+        """Check all expected services, raise AssertionError with missing."""
+        if self.expected:
+            self.assert_in_basket(self.expected)
+            self.expected.clear()
@@ -0,0 +1,379 @@
+import argparse
+import html
+import json
+import secrets
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs
+from urllib.parse import urlencode
+from urllib.parse import urlparse
+
+from traingin_selenium.providers import SBP_PAYMENT
+from traingin_selenium.providers import Provider
+from traingin_selenium.providers import providers
+
+
+# Предыдущие показания счетчиков которые "помнит" портал.
+WATER_READINGS = (('ГВС', '12.345'), ('ХВС', '23.456'))
+OLD_READINGS = {'gas': '1234.56', 'energy': '4321'}
+
+PAGE_TEMPLATE = '''<!DOCTYPE html>
+<html lang="ru">
+<head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+<header>{login}</header>
+<main>
+{content}
+</main>
+<script>{script}</script>
+</body>
+</html>
+'''
+# Первый Enter в поле периода приводит дату к формату ММ.ГГГГ, второй
+# отправляет форму (так ведет себя настоящий портал).
+PERIOD_JS = '''
+var period = document.getElementById('group-1-field-1-value');
+if (period) {
+    period.addEventListener('keydown', function (event) {
+        var match = /^(\\d{1,2})\\.(\\d{4})$/.exec(period.value);
+        if (event.key === 'Enter' && match && match[1].length === 1) {
+            event.preventDefault();
+            period.value = '0' + match[1] + '.' + match[2];
+        }
+    });
+}
+'''
+READINGS_JS = '''
+document.getElementById('send').addEventListener('click', function () {
+    var values = {};
+    document.querySelectorAll('.new-indication').forEach(function (input) {
+        values[input.name] = input.value;
+    });
+    fetch('/api/readings', {method: 'POST', body: JSON.stringify(values)})
+        .then(function (response) { return response.json(); })
+        .then(function () {
+            var result = document.getElementById('result');
+            result.innerHTML = '<p>Показания приняты</p>'
+                + '<button class="primary-btn">ОК</button>';
+            result.querySelector('button').addEventListener(
+                'click', function () { result.innerHTML = ''; }
+            );
+        });
+});
+'''
+PAYMENT_JS = '''
+var calcButton = document.getElementById('calcButton');
+if (calcButton) {
+    calcButton.addEventListener('click', function (event) {
+        event.preventDefault();
+        var value = document.querySelector('.newReading').value;
+        fetch('/api/calc?value=' + encodeURIComponent(value))
+            .then(function (response) { return response.json(); })
+            .then(function (data) {
+                document.getElementById('sum').textContent = data.sum;
+                document.getElementById('methods').hidden = false;
+            });
+    });
+}
+document.getElementById('add').addEventListener('click', function () {
+    var name = document.getElementById('serviceName').value;
+    fetch('/api/basket', {method: 'POST', body: JSON.stringify({name: name})})
+        .then(function () {
+            document.getElementById('added').textContent = 'Добавлено';
+        });
+});
+'''
+
+
+def get_checkbox(text: str, kind: str = 'checkbox', name: str = '') -> str:
+    # Локатор чекбокса: //span[text()=...]/../input.
+    return (
+        f'<label><input type="{kind}" name="{name}">'
+        f'<span>{html.escape(text)}</span></label>'
+    )
+
+
+def get_input(attr: str, value: str, name: str = '') -> str:
+    return f'<input {attr}="{value}" name="{name}" type="text">'
+
+
+class FakePortal(ThreadingHTTPServer):
+    """Local copy of lk.ric-ul.ru pages used by the payment script.
+
+    Pages answer after `delay` seconds, fetch requests of the pages (/api/*)
+    after `api_delay` seconds. Any login and password are accepted.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        delay: float = 0,
+        api_delay: float = 0,
+    ) -> None:
+        super().__init__((host, port), FakePortalHandler)
+        self.delay = delay
+        self.api_delay = api_delay
+        self.providers = {provider.name: provider for provider in providers}
+        # Корзины пользователей по токену сессии.
+        self.sessions: dict[str, list[str]] = dict()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host!s}:{port}/'
+
+    def start(self) -> 'FakePortal':
+        """Serve in a background thread."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class FakePortalHandler(BaseHTTPRequestHandler):
+    server: FakePortal
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Не засоряем вывод сценария логами запросов.
+        pass
+
+    def get_session(self) -> str | None:
+        cookie = SimpleCookie(self.headers.get('Cookie', ''))
+        token = cookie['session'].value if 'session' in cookie else None
+        with self.server.lock:
+            return token if token in self.server.sessions else None
+
+    def get_query(self) -> dict[str, str]:
+        query = parse_qs(urlparse(self.path).query)
+        return {key: values[0] for key, values in query.items()}
+
+    def read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def send(
+        self,
+        body: str,
+        content_type: str = 'text/html',
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        data = body.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Cache-Control', 'no-store')
+        for name, value in (headers or dict()).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_json(self, data: Any) -> None:
+        self.send(json.dumps(data, ensure_ascii=False), 'application/json')
+
+    def redirect(self, location: str, cookie: str | None = None) -> None:
+        self.send_response(303)
+        self.send_header('Location', location)
+        if cookie is not None:
+            self.send_header('Set-Cookie', cookie)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def send_page(self, title: str, content: str, script: str = '') -> None:
+        if self.get_session() is None:
+            login = '<a class="profile-login-btn" href="/Login">Войти</a>'
+        else:
+            login = '<a class="profile-logout-btn" href="/">Профиль</a>'
+        self.send(
+            PAGE_TEMPLATE.format(
+                title=title, login=login, content=content, script=script
+            )
+        )
+
+    def do_GET(self) -> None:
+        path = urlparse(self.path).path.rstrip('/') or '/'
+        if path.startswith('/api/'):
+            time.sleep(self.server.api_delay)
+            return self.api_get(path)
+
+        time.sleep(self.server.delay)
+        if path == '/':
+            return self.home_page()
+        if path == '/Login':
+            return self.login_page()
+        if self.get_session() is None:
+            return self.redirect('/')
+        if path == '/Basket':
+            return self.basket_page()
+        if path == '/Readings':
+            return self.readings_page()
+        if path == '/Readings/meters':
+            return self.meters_page()
+
+        parts = path.split('/')
+        provider = self.server.providers.get(
+            parts[2] if len(parts) > 2 else ''
+        )
+        if parts[1] != 'Pay' or provider is None:
+            return self.send_error(404)
+        if len(parts) == 3:
+            return self.account_page(provider)
+        if parts[3] == 'charges':
+            return self.charges_page(provider)
+        return self.payment_page(provider)
+
+    def do_POST(self) -> None:
+        path = urlparse(self.path).path
+        if path == '/Login':
+            time.sleep(self.server.delay)
+            form = parse_qs(self.read_body().decode())
+            if not form.get('login') or not form.get('password'):
+                return self.redirect('/Login')
+            token = secrets.token_hex(16)
+            with self.server.lock:
+                self.server.sessions[token] = list()
+            return self.redirect('/', f'session={token}; Path=/; HttpOnly')
+
+        time.sleep(self.server.api_delay)
+        session = self.get_session()
+        if session is None:
+            return self.send_error(403)
+        data = json.loads(self.read_body() or b'{}')
+        if path == '/api/readings':
+            return self.send_json({'accepted': data})
+        if path == '/api/basket':
+            with self.server.lock:
+                self.server.sessions[session].append(data['name'])
+            return self.send_json({'added': data['name']})
+        self.send_error(404)
+
+    def api_get(self, path: str) -> None:
+        if path == '/api/calc':
+            value = self.get_query().get('value', '0')
+            return self.send_json({'sum': f'{float(value) * 6.81:.2f}'})
+        self.send_error(404)
+
+    def home_page(self) -> None:
+        cards = ['<a href="/Readings"><b>Ввод показаний ЖКУ</b></a>']
+        for provider in self.server.providers.values():
+            text = html.escape(provider.card_text)
+            cards.append(f'<a href="/Pay/{provider.name}"><b>{text}</b></a>')
+        self.send_page('Главная', '\n'.join(cards))
+
+    def login_page(self) -> None:
+        content = (
+            '<form method="post" action="/Login">'
+            + get_input('id', 'Input_Login', 'login')
+            + '<input id="Input_Password" name="password" type="password">'
+            + '<button type="submit">Войти</button></form>'
+        )
+        self.send_page('Вход', content)
+
+    def basket_page(self) -> None:
+        session = self.get_session() or ''
+        with self.server.lock:
+            names = list(self.server.sessions[session])
+        items = [
+            f'<div class="basket-item">{html.escape(n)}</div>' for n in names
+        ]
+        self.send_page('Корзина', '\n'.join(items) or '<p>Корзина пуста</p>')
+
+    def readings_page(self) -> None:
+        content = (
+            '<form method="get" action="/Readings/meters">'
+            + get_checkbox('По лицевому счету', 'radio', 'mode')
+            + get_checkbox('По адресу', 'radio', 'mode')
+            + get_input('id', 'AccountNumberValue', 'account')
+            + '<button type="submit">Далее</button></form>'
+        )
+        self.send_page('Ввод показаний', content)
+
+    def meters_page(self) -> None:
+        rows = [
+            '<div class="indication-table-body">'
+            f'<div class="indication-table-type">{name}</div>'
+            f'<input readonly="readonly" value="{value}">'
+            f'<input class="form-input new-indication" name="{name}">'
+            '</div>'
+            for name, value in WATER_READINGS
+        ]
+        rows.append('<button id="send">Отправить показания</button>')
+        rows.append('<div id="result"></div>')
+        self.send_page('Показания', '\n'.join(rows), READINGS_JS)
+
+    def account_page(self, provider: Provider) -> None:
+        action = f'/Pay/{provider.name}/'
+        action += 'charges' if provider.sub_card is not None else 'form'
+        fields = [get_input('id', 'group-1-field-0-value', 'account')]
+        if provider.has_period:
+            fields.append(get_input('id', 'group-1-field-1-value', 'period'))
+        content = (
+            f'<form method="get" action="{action}">'
+            + ''.join(fields)
+            + '<button type="submit">Далее</button></form>'
+        )
+        self.send_page(provider.card_text, content, PERIOD_JS)
+
+    def charges_page(self, provider: Provider) -> None:
+        query = urlencode(self.get_query())
+        text = html.escape(provider.sub_card or '')
+        content = (
+            f'<a href="/Pay/{provider.name}/form?{query}"><b>{text}</b></a>'
+        )
+        self.send_page(provider.card_text, content)
+
+    def payment_page(self, provider: Provider) -> None:
+        account = self.get_query().get('account', '')
+        service_name = html.escape(f'{provider.card_text} (ЛС {account})')
+        content = [
+            f'<input id="serviceName" type="hidden" value="{service_name}">'
+        ]
+        content += [get_checkbox(text) for text in provider.checkboxes]
+        if provider.reading is not None:
+            old = OLD_READINGS.get(provider.name, '0')
+            content += [
+                f'<table><tr><td class="{provider.reading.class_name}">'
+                f'{old}</td></tr></table>',
+                '<input class="form-input newReading" type="text">',
+                '<a id="calcButton" href="#">Произвести расчет</a>',
+                '<div id="sum"></div>',
+            ]
+        if provider.send_email:
+            content.append(get_input('id', 'email', 'email'))
+        # Способы оплаты показываются после расчета суммы.
+        hidden = ' hidden' if provider.reading is not None else ''
+        content.append(
+            f'<div id="methods"{hidden}>'
+            + get_checkbox(SBP_PAYMENT, 'radio', 'method')
+            + get_checkbox('Банковская карта', 'radio', 'method')
+            + '</div>'
+        )
+        content.append('<button id="add">Добавить в корзину</button>')
+        content.append('<div id="added"></div>')
+        self.send_page(provider.card_text, '\n'.join(content), PAYMENT_JS)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Serve local copy of the utility payment portal.'
+    )
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--delay', type=float, default=0)
+    parser.add_argument('--api-delay', type=float, default=0)
+    args = parser.parse_args()
+
+    portal = FakePortal(
+        port=args.port, delay=args.delay, api_delay=args.api_delay
+    )
+    print(f'Serving {portal.url}, run the payment script with:')
+    print(f'RIZ_HOME_PAGE={portal.url} RIZ_AUTO_READINGS=1 ...')
+    portal.serve_forever()
@@ -0,0 +1,106 @@
+import json
+import os
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Sequence
+
+from pydantic import BaseModel
+
+
+Step = tuple[str, Callable[[], Any]]
+
+
+class Checkpoint(BaseModel):
+    done: list[str] = list()
+    timings: dict[str, float] = dict()
+    failed: str | None = None
+    # Что вернули выполненные шаги (должно сохраняться в JSON).
+    results: dict[str, Any] = dict()
+
+
+def get_month_key(day: date | None = None) -> str:
+    """Return checkpoint key of the month ('2024-01'), pay once a month."""
+    return f'{day or date.today():%Y-%m}'
+
+
+class Flow:
+    """Run named steps, skip steps finished in the previous runs.
+
+    After each step its state (and the value returned by the step) is saved
+    to JSON file `path` under the `key`, so a rerun after a failure starts
+    from the first unfinished step.
+    """
+
+    def __init__(self, path: str | Path, key: str | None = None) -> None:
+        self.path = Path(path)
+        self.key = key or get_month_key()
+        self.checkpoints = self.load()
+        self.checkpoint = self.checkpoints.setdefault(self.key, Checkpoint())
+
+    def load(self) -> dict[str, Checkpoint]:
+        if not self.path.is_file():
+            return dict()
+        with open(self.path, encoding='utf-8') as file:
+            data = json.load(file)
+        return {key: Checkpoint(**value) for key, value in data.items()}
+
+    def save(self) -> None:
+        """Save checkpoints atomically (file is never half-written)."""
+        data = {k: v.model_dump() for k, v in self.checkpoints.items()}
+        tmp_path = self.path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(data, file, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def is_done(self, name: str) -> bool:
+        return name in self.checkpoint.done
+
+    def pending(self, steps: Sequence[Step]) -> list[Step]:
+        """Return steps which are not finished yet."""
+        return [step for step in steps if not self.is_done(step[0])]
+
+    def run(self, steps: Sequence[Step]) -> None:
+        """Run unfinished steps in order, stop on the first failure."""
+        names = [name for name, _ in steps]
+        if len(set(names)) != len(names):
+            raise ValueError(f'Step names are not unique: {names}.')
+        for name, step in self.pending(steps):
+            start = time.perf_counter()
+            try:
+                result = step()
+            except BaseException:
+                self.checkpoint.failed = name
+                raise
+            else:
+                self.checkpoint.done.append(name)
+                self.checkpoint.failed = None
+                if result is not None:
+                    self.checkpoint.results[name] = result
+            finally:
+                elapsed = time.perf_counter() - start
+                self.checkpoint.timings[name] = elapsed
+                self.save()
+
+    def get_result(self, name: str) -> Any:
+        """Return result of the finished step or None."""
+        return self.checkpoint.results.get(name)
+
+    def undo(self, names: Sequence[str]) -> None:
+        """Mark finished steps as not done, the next run repeats them."""
+        for name in names:
+            if name in self.checkpoint.done:
+                self.checkpoint.done.remove(name)
+            self.checkpoint.results.pop(name, None)
+        self.save()
+
+    def reset(self) -> None:
+        """Forget progress of the current key."""
+        self.checkpoint = self.checkpoints[self.key] = Checkpoint()
+        self.save()
+
+    def report(self) -> dict[str, float]:
+        """Return time of each step of the current key (last run)."""
+        return dict(self.checkpoint.timings)
@@ -0,0 +1,27 @@
+from browser.locators import LocatorRegistry
+
+
+# Все локаторы сценария оплаты объявляются один раз в этом месте.
+locators = LocatorRegistry()
+locators.register('auth_button', '//a[@class="profile-login-btn"]')
+locators.register('basket_service', '//*[contains(text(), {service_name})]')
+locators.register('button_with_text', '//button[text()={text}]')
+locators.register('card_with_text', '//b[text()={text}]')
+locators.register('checkbox_input', '//span[text()={text}]/../input')
+locators.register('checkbox_label', '//span[text()={text}]')
+locators.register('href_with_id', '//a[@id={id_value}]')
+locators.register(
+    'input_with_attr', '//input[@{attr_name}={attr_value}]', raw=('attr_name',)
+)
+locators.register('old_reading', '//td[contains(@class, {class_name})]')
+locators.register('service_name_field', '//input[@id="serviceName"]')
+locators.register(
+    'ok_button', '//button[@class="primary-btn" and text()={text}]'
+)
+# Счетчики воды.
+locators.register('indicators', '//div[@class="indication-table-body"]')
+locators.register('indicator_last_value', './/input[@readonly="readonly"]')
+locators.register('indicator_type', './/div[@class="indication-table-type"]')
+locators.register(
+    'indicator_input', './/input[contains(@class, "new-indication")]'
+)
@@ -0,0 +1,85 @@
+from pydantic import BaseModel
+
+
+# Способ оплаты (пробел в конце не опечатка так в HTML).
+SBP_PAYMENT = 'Система быстрых платежей Банка России '
+WITH_DEBT = 'Оплата с учетом задолженности за прошлые периоды'
+
+
+class Reading(BaseModel):
+    """Meter reading which is entered before the sum is calculated."""
+
+    name: str  # Название для вывода пользователю.
+    class_name: str  # Класс ячейки с предыдущим показанием.
+    regex: str  # Формат числа показания.
+
+
+class Provider(BaseModel):
+    """Payment of one service, steps are performed in this order:
+
+    card -> account number -> period -> sub card -> checkboxes ->
+    reading and calculation -> email -> payment method -> add to basket.
+    """
+
+    name: str
+    card_text: str
+    account_env: str
+    has_period: bool = False
+    sub_card: str | None = None
+    checkboxes: tuple[str, ...] = tuple()
+    reading: Reading | None = None
+    send_email: bool = False
+    payment_method: str | None = SBP_PAYMENT
+
+
+providers = (
+    Provider(
+        name='gas',
+        card_text='ООО "Газпром межрегионгаз Ульяновск"',
+        account_env='GAS_ACCOUNT_NUM',
+        checkboxes=('Многоквартирные дома (6.81 руб./1 куб.м)',),
+        reading=Reading(
+            name='ГАЗА',
+            class_name='pay-gazul-old',
+            regex=r'[\d]*[.]?[\d]{1,2}',
+        ),
+    ),
+    Provider(
+        name='energy',
+        card_text='АО "Ульяновскэнерго"',
+        account_env='ENERGY_ACCOUNT_NUM',
+        has_period=True,
+        reading=Reading(
+            name='ЭЛЕКТРОЭНЕРГИИ',
+            class_name='pay-ulenergo-old',
+            regex=r'[\d]+',
+        ),
+    ),
+    Provider(
+        name='water',
+        card_text='Оплата жилого помещения и коммунальных услуг',
+        account_env='WATER_ACCOUNT_NUM',
+        has_period=True,
+        sub_card='Начисление РКЦ Ульяновск',
+        checkboxes=(WITH_DEBT,),
+        send_email=True,
+    ),
+    Provider(
+        name='repair',
+        card_text='Фонд капитального ремонта',
+        account_env='REPAIR_ACCOUNT_NUM',
+        has_period=True,
+        checkboxes=(WITH_DEBT,),
+        send_email=True,
+        payment_method=None,
+    ),
+    Provider(
+        name='heating',
+        card_text='ПАО "Т Плюс"',
+        account_env='HEATING_ACCOUNT_NUM',
+        has_period=True,
+        checkboxes=(WITH_DEBT,),
+        send_email=True,
+        payment_method=None,
+    ),
+)